@@ -4,7 +4,10 @@ fuzzy entity matching, connection query detection, and Supabase entity lookups.
 """
 
 import re
-from collections import deque
+import copy
+import threading
+import time
+from collections import OrderedDict, deque
 from typing import Optional, List
 
 # --- Connection Query Detection ---
@@ -240,11 +243,57 @@ def compute_communities(graph_data: dict) -> dict:
 
 # --- Supabase Direct Entity Lookups ---
 
+# Process-local LRU memo of entity intel and BFS results, so repeat
+# investigations of the same subject skip the Supabase round-trips. Entries
+# expire after _GRAPH_CACHE_TTL seconds; graph writes made by this process call
+# invalidate_graph_cache(), which drops everything and bumps the version so a
+# read already in flight can't store pre-write results.
+_GRAPH_CACHE_MAX = 256
+_GRAPH_CACHE_TTL = 300
+_graph_cache: "OrderedDict[tuple, tuple[float, object]]" = OrderedDict()
+_graph_cache_lock = threading.Lock()
+_graph_version = 0
+
+
+def invalidate_graph_cache():
+    """Forget memoized graph reads; call after writing nodes or edges."""
+    global _graph_version
+    with _graph_cache_lock:
+        _graph_version += 1
+        _graph_cache.clear()
+
+
+def _cached_graph_read(key: tuple, fn, *args):
+    now = time.monotonic()
+    with _graph_cache_lock:
+        hit = _graph_cache.get(key)
+        if hit is not None and now - hit[0] < _GRAPH_CACHE_TTL:
+            _graph_cache.move_to_end(key)
+            # Callers get their own copy so they can't mutate the cached entry
+            return copy.deepcopy(hit[1])
+        version = _graph_version
+
+    value = fn(*args)
+
+    with _graph_cache_lock:
+        if version == _graph_version:
+            _graph_cache[key] = (now, value)
+            _graph_cache.move_to_end(key)
+            while len(_graph_cache) > _GRAPH_CACHE_MAX:
+                _graph_cache.popitem(last=False)
+    return copy.deepcopy(value)
+
+
 def lookup_entity_intel(supabase_client, entity_name: str) -> dict:
     """
     Fuzzy-match an entity name against the Supabase `nodes` table, then fetch
     its edges and connected entities. Returns structured intel dict.
+    Results are memoized per entity name (see _cached_graph_read).
     """
+    return _cached_graph_read(("intel", entity_name), _lookup_entity_intel, supabase_client, entity_name)
+
+
+def _lookup_entity_intel(supabase_client, entity_name: str) -> dict:
     name_norm = _normalize(entity_name)
     if not name_norm:
         return {"found": False, "entity_name": entity_name}
@@ -339,11 +388,54 @@ def keyword_search_evidence(supabase_client, names: List[str], limit: int = 10)
     return results[:limit * 2]
 
 
+# Only the fields the investigation context uses, instead of whole edge rows
+_BFS_EDGE_COLUMNS = "id, source, target, predicate, evidence_text, source_filename"
+_BFS_EDGES_PER_NODE = 25  # edges kept per frontier node, each direction
+
+
 def bfs_collect_evidence(supabase_client, start_entity_id: str, max_hops: int = 2, max_edges: int = 50) -> list:
     """
     BFS from a starting entity via targeted Supabase edge queries.
-    Collects evidence text from traversed edges. Returns list of edge dicts.
+    Each hop fetches the edges of the whole frontier in two queries (outgoing and
+    incoming) rather than two per node, keeping at most _BFS_EDGES_PER_NODE per
+    node. Collects evidence text from traversed edges. Returns list of edge dicts,
+    memoized per (entity, max_hops, max_edges).
     """
+    return _cached_graph_read(
+        ("bfs", start_entity_id, max_hops, max_edges),
+        _bfs_collect_evidence, supabase_client, start_entity_id, max_hops, max_edges,
+    )
+
+
+def _bfs_frontier_edges(supabase_client, column: str, frontier: list, budget: int) -> dict:
+    """
+    Edges whose `column` ("source" or "target") is a frontier node, as
+    node -> up to _BFS_EDGES_PER_NODE edges. One query covers the whole frontier.
+    If it came back truncated at its limit (a hub node can fill it on its own),
+    the nodes it left with no edges are re-queried together, until `budget`
+    edges (what the BFS can still keep) have been gathered.
+    """
+    by_node = {node_id: [] for node_id in frontier}
+    pending = frontier
+    kept = 0
+    while pending:
+        # Up to _BFS_EDGES_PER_NODE edges per node, bounded by what can be kept
+        limit = min(_BFS_EDGES_PER_NODE * len(pending), 2 * budget)
+        res = supabase_client.table("edges").select(_BFS_EDGE_COLUMNS).in_(column, pending).limit(limit).execute()
+        rows = res.data or []
+        for e in rows:
+            node_edges = by_node.get(e[column])
+            if node_edges is not None and len(node_edges) < _BFS_EDGES_PER_NODE:
+                node_edges.append(e)
+                kept += 1
+        if len(rows) < limit or kept >= budget:
+            break
+        # Every truncated round serves at least one pending node, so this shrinks
+        pending = [node_id for node_id in pending if not by_node[node_id]]
+    return by_node
+
+
+def _bfs_collect_evidence(supabase_client, start_entity_id: str, max_hops: int, max_edges: int) -> list:
     visited_nodes = {start_entity_id}
     frontier = [start_entity_id]
     collected_edges = []
@@ -352,14 +444,15 @@ def bfs_collect_evidence(supabase_client, start_entity_id: str, max_hops: int =
     for _hop in range(max_hops):
         if not frontier or len(collected_edges) >= max_edges:
             break
+        budget = max_edges - len(collected_edges)
+        edges_src = _bfs_frontier_edges(supabase_client, "source", frontier, budget)
+        edges_tgt = _bfs_frontier_edges(supabase_client, "target", frontier, budget)
         next_frontier = []
+        # Node by node, in frontier order, so no single node's edges crowd out the rest
         for node_id in frontier:
             if len(collected_edges) >= max_edges:
                 break
-            # Fetch edges for this node
-            edges_src = supabase_client.table("edges").select("*").eq("source", node_id).limit(25).execute()
-            edges_tgt = supabase_client.table("edges").select("*").eq("target", node_id).limit(25).execute()
-            for e in (edges_src.data or []) + (edges_tgt.data or []):
+            for e in edges_src[node_id] + edges_tgt[node_id]:
                 if e["id"] not in seen_edge_ids:
                     seen_edge_ids.add(e["id"])
                     collected_edges.append(e)
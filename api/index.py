@@ -1,11 +1,18 @@
 import os
 import re
 import json
-import shutil
+import asyncio
+import orjson
+import io
 import tempfile
 import uuid
-from collections import defaultdict
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, UploadFile, File, BackgroundTasks, Request, Query
 from fastapi.responses import JSONResponse, StreamingResponse, RedirectResponse
@@ -21,6 +28,22 @@ from google.cloud import storage
 from pypdf import PdfReader
 from supabase import create_client, Client
 
+# Graph helpers are resolved once here rather than re-imported per request;
+# networkx itself stays lazy inside compute_communities
+try:
+    from api.graph_ops import (
+        compute_communities, detect_connection_query, find_paths_narrative, invalidate_graph_cache,
+    )
+except ImportError:
+    try:
+        from graph_ops import (
+            compute_communities, detect_connection_query, find_paths_narrative, invalidate_graph_cache,
+        )
+    except ImportError as e:
+        print(f"DEBUG: graph_ops unavailable: {e}")
+        compute_communities = detect_connection_query = find_paths_narrative = None
+        invalidate_graph_cache = None
+
 load_dotenv()
 
 app = FastAPI(title="LocalWebb Cloud API")
@@ -264,6 +287,10 @@ class SupabaseStore:
                 
         except Exception as e:
             print(f"Failed to upsert elements to Supabase: {e}")
+        finally:
+            # Investigator graph reads are memoized; a partial write still counts
+            if invalidate_graph_cache:
+                invalidate_graph_cache()
 
 graph_store = SupabaseStore()
 
@@ -333,6 +360,8 @@ async def migrate_graph_to_supabase():
             supabase.table("nodes").upsert(node_records, on_conflict="id").execute()
         if edge_records:
             supabase.table("edges").upsert(edge_records, on_conflict="id").execute()
+        if invalidate_graph_cache:
+            invalidate_graph_cache()
 
         return JSONResponse(status_code=200, content={
             "message": f"Migrated {len(node_records)} nodes and {len(edge_records)} edges to Supabase."
@@ -393,6 +422,7 @@ class InvestigateRequest(BaseModel):
     query: str
     entity_id: Optional[str] = None
     mode: str = "files_only"
+    include_followups: bool = True
 
 class CreateCaseRequest(BaseModel):
     title: str
@@ -623,7 +653,8 @@ async def get_insights(depth: str = "standard", focus: Optional[str] = None, str
         )
 
         print("DEBUG: Sending extraction prompt to Gemini...")
-        res = client.models.generate_content(
+        res = await asyncio.to_thread(
+            client.models.generate_content,
             model="gemini-2.5-pro",
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -687,15 +718,6 @@ async def get_insights(depth: str = "standard", focus: Optional[str] = None, str
         graph_store.add_elements(new_nodes, new_edges)
 
         # Run community detection if available
-        try:
-            from api.graph_ops import compute_communities
-        except ImportError:
-            try:
-                from graph_ops import compute_communities
-            except ImportError as e:
-                print(f"DEBUG: graph_ops unavailable: {e}")
-                compute_communities = None
-
         if compute_communities:
             graph_data = graph_store.load()
             graph_data = compute_communities(graph_data)
@@ -726,8 +748,9 @@ async def get_insights(depth: str = "standard", focus: Optional[str] = None, str
         import traceback; traceback.print_exc()
         return graph_store.load()
 
+@lru_cache(maxsize=None)
 def _get_rerank_fn():
-    """Lazy-load the reranker function."""
+    """Lazy-load the reranker function (resolved once, then cached)."""
     try:
         from api.reranker import rerank
         return rerank
@@ -739,28 +762,10 @@ def _get_rerank_fn():
             return None
 
 
-def _semantic_search_pass(query_text, genai_client, pinecone_index, rerank_fn=None,
-                          fetch_k=200, rerank_top_n=5, pinecone_filter=None) -> list:
-    """
-    Single semantic search pass: embed query → Pinecone similarity search → extract text → rerank.
-    Returns list of dicts with keys: text, filename, page, score.
-    """
-    # 1. Embed query
-    res = genai_client.models.embed_content(
-        model="gemini-embedding-001",
-        contents=[query_text]
-    )
-    embedding = res.embeddings[0].values
-
-    # 2. Query Pinecone
-    query_kwargs = dict(vector=embedding, top_k=fetch_k, include_metadata=True)
-    if pinecone_filter:
-        query_kwargs["filter"] = pinecone_filter
-    results = pinecone_index.query(**query_kwargs)
-
-    # 3. Extract text + metadata
+def _matches_to_candidates(matches) -> list:
+    """Extract text + metadata from Pinecone matches into candidate dicts."""
     candidates = []
-    for r in results.matches:
+    for r in matches:
         if not r.metadata:
             continue
         text = ""
@@ -782,8 +787,67 @@ def _semantic_search_pass(query_text, genai_client, pinecone_index, rerank_fn=No
                 "text": text, "filename": filename, "page": page,
                 "score": r.score,
             })
+    return candidates
+
+
+# Query embeddings keyed by (model, whitespace-normalized text), shared across
+# passes and requests; entries expire after an hour. Search passes run in worker
+# threads, hence the lock.
+_QUERY_EMBED_MODEL = "gemini-embedding-001"
+_QUERY_EMBED_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (timestamp, values)
+_QUERY_EMBED_CACHE_MAX = 4096
+_QUERY_EMBED_CACHE_TTL = 3600  # seconds
+_query_embed_lock = threading.Lock()
+
 
-    # 4. Cross-encoder reranking
+def _embed_queries(genai_client, texts: list) -> list:
+    """Embed query texts; repeats come from the LRU, misses share one embed call.
+
+    Each text is whitespace-normalized first, and the normalized text is both the
+    cache key and what gets embedded, so every spelling of a query that collapses
+    to the same key gets the identical vector, whichever of them missed first.
+    """
+    normalized = [" ".join(t.split()) for t in texts]
+    now = time.monotonic()
+    found = {}
+    with _query_embed_lock:
+        for t in normalized:
+            key = (_QUERY_EMBED_MODEL, t)
+            hit = _QUERY_EMBED_CACHE.get(key)
+            if hit is None:
+                continue
+            if now - hit[0] < _QUERY_EMBED_CACHE_TTL:
+                _QUERY_EMBED_CACHE.move_to_end(key)
+                found[t] = hit[1]
+            else:
+                del _QUERY_EMBED_CACHE[key]
+
+    missing = list(dict.fromkeys(t for t in normalized if t not in found))
+    if missing:
+        # Embed the normalized strings themselves (never the caller's spelling),
+        # so each cached vector is the embedding of its key
+        res = genai_client.models.embed_content(model=_QUERY_EMBED_MODEL, contents=missing)
+        with _query_embed_lock:
+            for t, e in zip(missing, res.embeddings):
+                found[t] = e.values
+                _QUERY_EMBED_CACHE[(_QUERY_EMBED_MODEL, t)] = (now, e.values)
+            while len(_QUERY_EMBED_CACHE) > _QUERY_EMBED_CACHE_MAX:
+                _QUERY_EMBED_CACHE.popitem(last=False)
+
+    return [found[t] for t in normalized]
+
+
+def _query_and_rerank(embedding, query_text, pinecone_index, rerank_fn=None,
+                      fetch_k=200, rerank_top_n=5, pinecone_filter=None) -> list:
+    """Pinecone similarity search for a precomputed embedding, then rerank."""
+    query_kwargs = dict(vector=embedding, top_k=fetch_k, include_metadata=True)
+    if pinecone_filter:
+        query_kwargs["filter"] = pinecone_filter
+    results = pinecone_index.query(**query_kwargs)
+
+    candidates = _matches_to_candidates(results.matches)
+
+    # Cross-encoder reranking
     if rerank_fn and len(candidates) > rerank_top_n:
         try:
             candidates = rerank_fn(query_text, candidates, top_n=rerank_top_n)
@@ -796,6 +860,48 @@ def _semantic_search_pass(query_text, genai_client, pinecone_index, rerank_fn=No
     return candidates
 
 
+def _semantic_search_pass(query_text, genai_client, pinecone_index, rerank_fn=None,
+                          fetch_k=200, rerank_top_n=5, pinecone_filter=None) -> list:
+    """
+    Single semantic search pass: embed query → Pinecone similarity search → extract text → rerank.
+    Returns list of dicts with keys: text, filename, page, score.
+    """
+    embedding = _embed_queries(genai_client, [query_text])[0]
+    return _query_and_rerank(
+        embedding, query_text, pinecone_index, rerank_fn=rerank_fn,
+        fetch_k=fetch_k, rerank_top_n=rerank_top_n, pinecone_filter=pinecone_filter,
+    )
+
+
+# Shared pool for fanning out batched Pinecone queries, instead of a new
+# executor per batch
+_pinecone_query_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pinecone-query")
+
+
+def _semantic_search_batch(queries, genai_client, pinecone_index, rerank_fn=None) -> list:
+    """
+    Batched semantic search: one embedding call for every uncached query text, then the
+    Pinecone queries fan out concurrently (the SDK takes one vector per query).
+    Each entry in `queries` is a dict with query_text and optional fetch_k,
+    rerank_top_n, pinecone_filter. Returns one candidate list per query, in order.
+    """
+    if not queries:
+        return []
+    embeddings = _embed_queries(genai_client, [q["query_text"] for q in queries])
+
+    def _run(args):
+        q, embedding = args
+        return _query_and_rerank(
+            embedding, q["query_text"], pinecone_index, rerank_fn=rerank_fn,
+            fetch_k=q.get("fetch_k", 200), rerank_top_n=q.get("rerank_top_n", 5),
+            pinecone_filter=q.get("pinecone_filter"),
+        )
+
+    if len(queries) == 1:
+        return [_run((queries[0], embeddings[0]))]
+    return list(_pinecone_query_pool.map(_run, zip(queries, embeddings)))
+
+
 def _build_query_context(request):
     """Shared logic: embed query, search Pinecone (with optional filters + reranking), build context + sources."""
     if not index:
@@ -834,16 +940,26 @@ def _build_query_context(request):
     context_parts = []
     sources = []
     seen_files = set()
+    parts_append = context_parts.append
     for c in candidates:
-        context_parts.append(f"[Source: {c['filename']}, Page: {c['page']}]\n{c['text'][:1200]}")
-        if c["filename"] not in seen_files:
-            seen_files.add(c["filename"])
-            sources.append({"filename": c["filename"], "page": c["page"], "score": round(c["score"], 3) if c["score"] else None})
+        filename = c["filename"]
+        text = c["text"]
+        # Most chunks are already under the cap; skip the slice copy for those
+        snippet = text if len(text) <= 1200 else text[:1200]
+        parts_append(f"[Source: {filename}, Page: {c['page']}]\n{snippet}")
+        if filename not in seen_files:
+            seen_files.add(filename)
+            sources.append({"filename": filename, "page": c["page"], "score": round(c["score"], 3) if c["score"] else None})
 
     context = "\n\n".join(context_parts)
     return context, sources
 
 
+# Each SSE yield should reach the client immediately: no proxy buffering
+# (nginx honours X-Accel-Buffering) and no intermediary caching
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
 QUERY_PROMPT_TEMPLATE = (
     "You are an investigative research assistant. Answer based ONLY on the provided context.\n"
     "Cite your sources by referencing the [Source: filename] tags when making claims.\n\n"
@@ -852,35 +968,43 @@ QUERY_PROMPT_TEMPLATE = (
     "Provide a thorough but concise answer. At the end, list the source documents you referenced."
 )
 
+# Context size above which /api/query answers with Pro instead of Flash
+QUERY_PRO_CONTEXT_CHARS = 30000
+
+
+def _query_answer_model(full_context: str, graph_context: str) -> str:
+    """Flash for short single-hop contexts; Pro for long contexts or graph path answers."""
+    if graph_context or len(full_context) > QUERY_PRO_CONTEXT_CHARS:
+        return "gemini-2.5-pro"
+    return "gemini-2.0-flash"
+
 
 @app.post("/api/query")
 async def query_index(request: FilteredQueryRequest):
     try:
         print(f"DEBUG: Starting query for: {request.query}")
 
+        # Embedding + Pinecone retrieval is blocking; run it off the event loop,
+        # overlapped with the graph path search below
+        context_task = asyncio.ensure_future(asyncio.to_thread(_build_query_context, request))
+
         # Check if this is a connection-style query
         graph_context = ""
-        try:
-            from api.graph_ops import detect_connection_query, find_paths_narrative
-        except ImportError:
-            try:
-                from graph_ops import detect_connection_query, find_paths_narrative
-            except ImportError as e:
-                print(f"DEBUG: graph_ops unavailable: {e}")
-                detect_connection_query = None
-                find_paths_narrative = None
-
         if detect_connection_query and find_paths_narrative:
             conn_match = detect_connection_query(request.query)
             if conn_match:
                 entity_a, entity_b = conn_match
                 print(f"DEBUG: Connection query detected: '{entity_a}' <-> '{entity_b}'")
-                graph_data = graph_store.load()
-                graph_context = find_paths_narrative(graph_data, entity_a, entity_b)
+                try:
+                    graph_data = await asyncio.to_thread(graph_store.load)
+                    graph_context = await asyncio.to_thread(find_paths_narrative, graph_data, entity_a, entity_b)
+                except Exception:
+                    context_task.cancel()
+                    raise
                 if graph_context:
                     graph_context = f"\n\nGRAPH CONNECTIONS FOUND:\n{graph_context}\n"
 
-        context, sources = _build_query_context(request)
+        context, sources = await context_task
 
         if not context and not graph_context:
             print("DEBUG: No context found")
@@ -889,6 +1013,8 @@ async def query_index(request: FilteredQueryRequest):
         full_context = context
         if graph_context:
             full_context = graph_context + "\n\nDOCUMENT CONTEXT:\n" + context
+        answer_model = _query_answer_model(full_context, graph_context)
+        print(f"DEBUG: Answering with {answer_model} ({len(full_context)} context chars)")
 
         # Streaming path
         if request.stream:
@@ -896,25 +1022,28 @@ async def query_index(request: FilteredQueryRequest):
 
             async def event_stream():
                 try:
-                    stream = client.models.generate_content_stream(
-                        model="gemini-2.5-pro",
+                    # Async stream: each chunk await yields to the event loop
+                    # instead of blocking it between tokens
+                    stream = await client.aio.models.generate_content_stream(
+                        model=answer_model,
                         contents=prompt
                     )
-                    for chunk in stream:
+                    async for chunk in stream:
                         if chunk.text:
-                            yield f"data: {json.dumps({'text': chunk.text})}\n\n"
-                    yield f"data: {json.dumps({'sources': sources, 'done': True})}\n\n"
+                            yield b"data: " + orjson.dumps({'text': chunk.text}) + b"\n\n"
+                    yield b"data: " + orjson.dumps({'sources': sources, 'done': True}) + b"\n\n"
                 except Exception as e:
-                    yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                    yield b"data: " + orjson.dumps({'error': str(e)}) + b"\n\n"
 
-            return StreamingResponse(event_stream(), media_type="text/event-stream")
+            return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
         # Non-streaming path
         print("DEBUG: Generating Gemini response...")
         prompt = QUERY_PROMPT_TEMPLATE.format(context=full_context, query=request.query)
 
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
+        response = await asyncio.to_thread(
+            client.models.generate_content,
+            model=answer_model,
             contents=prompt
         )
         print("DEBUG: Query successful")
@@ -967,11 +1096,14 @@ async def investigate(request: InvestigateRequest):
             pinecone_index=index,
             supabase_client=supabase,
             semantic_search_fn=_semantic_search_pass,
+            semantic_search_batch_fn=_semantic_search_batch,
             rerank_fn=None,
             case_context=case_context,
             mode=request.mode,
+            include_followups=request.include_followups,
         ),
         media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
 
 
@@ -993,7 +1125,6 @@ async def scan_for_cases():
         except ImportError:
             from scanner import run_scan
 
-        import asyncio
         findings = await asyncio.to_thread(
             run_scan, client, supabase, index, _semantic_search_pass
         )
@@ -1122,7 +1253,7 @@ async def investigate_case(case_id: str):
     query = f"Investigate: {case_data['title']}"
 
     async def stream_and_save():
-        full_text = ""
+        text_parts = []
         all_sources = []
         async for event in run_investigation(
             query=query,
@@ -1130,34 +1261,40 @@ async def investigate_case(case_id: str):
             pinecone_index=index,
             supabase_client=supabase,
             semantic_search_fn=_semantic_search_pass,
+            semantic_search_batch_fn=_semantic_search_batch,
             rerank_fn=None,
             case_context=case_context,
         ):
+            # Events are already encoded SSE bytes; pass them through untouched
             yield event
+            # Progress events carry nothing to save, skip parsing them
+            if not event.startswith(b"data: ") or event.startswith(b'data: {"type":"step_status"'):
+                continue
             # Collect text and sources for saving
             try:
-                if event.startswith("data: "):
-                    data = json.loads(event[6:].strip())
-                    if data.get("type") == "text":
-                        full_text += data.get("text", "")
-                    elif data.get("type") == "sources":
-                        all_sources = data.get("sources", [])
-                    elif data.get("type") == "done" and full_text:
-                        # Save evidence
-                        try:
-                            supabase.table("case_evidence").insert({
-                                "case_id": case_id,
-                                "type": "investigation",
-                                "content": full_text,
-                                "sources": all_sources,
-                            }).execute()
-                            supabase.table("cases").update({"updated_at": datetime.now(timezone.utc).isoformat()}).eq("id", case_id).execute()
-                        except Exception as save_err:
-                            print(f"DEBUG: Failed to save case evidence: {save_err}")
-            except (json.JSONDecodeError, KeyError):
+                data = orjson.loads(event[6:])
+                if data.get("type") == "text":
+                    text_parts.append(data.get("text", ""))
+                elif data.get("type") == "sources":
+                    all_sources = data.get("sources", [])
+                elif data.get("type") == "done" and text_parts:
+                    # Save evidence
+                    try:
+                        await asyncio.to_thread(supabase.table("case_evidence").insert({
+                            "case_id": case_id,
+                            "type": "investigation",
+                            "content": "".join(text_parts),
+                            "sources": all_sources,
+                        }).execute)
+                        await asyncio.to_thread(
+                            supabase.table("cases").update({"updated_at": datetime.now(timezone.utc).isoformat()}).eq("id", case_id).execute
+                        )
+                    except Exception as save_err:
+                        print(f"DEBUG: Failed to save case evidence: {save_err}")
+            except (orjson.JSONDecodeError, KeyError):
                 pass
 
-    return StreamingResponse(stream_and_save(), media_type="text/event-stream")
+    return StreamingResponse(stream_and_save(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @app.post("/api/cases/{case_id}/consolidate")
@@ -1182,14 +1319,11 @@ async def consolidate_case_evidence(case_id: str):
             if e.get("sources"):
                 all_sources.extend(e["sources"])
 
-        # De-duplicate sources
-        unique_sources = []
-        seen_src = set()
-        for s in all_sources:
-            sig = f"{s.get('filename')}:{s.get('page')}"
-            if sig not in seen_src:
-                seen_src.add(sig)
-                unique_sources.append(s)
+        # De-duplicate sources by (filename, page), first seen wins
+        sources_by_key = {}
+        for src in all_sources:
+            sources_by_key.setdefault((src.get('filename'), src.get('page')), src)
+        unique_sources = list(sources_by_key.values())
 
         prompt = f"""You are a Lead Intelligence Analyst. You are tasked with synthesizing multiple investigative findings into a single, master "Consolidated Intelligence Report".
 
@@ -1206,7 +1340,8 @@ SYNTHESIS INSTRUCTIONS:
 Produce a professional, final investigative product."""
 
         # 3. Generate with Gemini
-        res = client.models.generate_content(
+        res = await asyncio.to_thread(
+            client.models.generate_content,
             model="gemini-2.5-pro",
             contents=prompt,
         )
@@ -1692,7 +1827,8 @@ Provide a concise analysis (3-5 bullet points) covering:
 
 Be specific, reference actual entity names, and flag anything that looks unusual or warrants further scrutiny. Keep each bullet to 1-2 sentences."""
 
-        res = client.models.generate_content(
+        res = await asyncio.to_thread(
+            client.models.generate_content,
             model="gemini-2.0-flash",
             contents=prompt,
         )
@@ -1708,14 +1844,15 @@ Analysis:
 Example output: ["Knight Capital", "Cereplast management", "John Doe"]"""
 
         try:
-            extract_res = client.models.generate_content(
+            extract_res = await asyncio.to_thread(
+                client.models.generate_content,
                 model="gemini-2.0-flash",
                 contents=extract_prompt,
             )
-            import re as _re
-            # Parse the JSON array from the response
-            match = _re.search(r'\[.*\]', extract_res.text, _re.DOTALL)
-            search_terms = json.loads(match.group()) if match else []
+            # Parse the first JSON array in the response; raw_decode stops at its
+            # end instead of a greedy regex spanning to the last ']'
+            start = extract_res.text.find('[')
+            search_terms = json.JSONDecoder().raw_decode(extract_res.text, start)[0] if start >= 0 else []
         except Exception:
             search_terms = []
 
@@ -1781,7 +1918,8 @@ Based on these new findings, provide a follow-up report:
 Be specific, name names, and think like a journalist building a story. Keep it concise — 3-5 bullet points."""
 
             try:
-                follow_up_res = client.models.generate_content(
+                follow_up_res = await asyncio.to_thread(
+                    client.models.generate_content,
                     model="gemini-2.0-flash",
                     contents=follow_up_prompt,
                 )
@@ -1879,7 +2017,8 @@ Answer the researcher's questions using this context. Be specific, cite entity n
         for msg in request.messages:
             contents.append(f"{'Researcher' if msg['role'] == 'user' else 'Journalist'}: {msg['content']}")
 
-        res = client.models.generate_content(
+        res = await asyncio.to_thread(
+            client.models.generate_content,
             model="gemini-2.0-flash",
             contents="\n\n".join(contents),
         )
@@ -1994,7 +2133,8 @@ async def targeted_search(request: TargetedSearchRequest):
             "Return JSON with 'entities' and 'triples' keys."
         )
 
-        res = client.models.generate_content(
+        res = await asyncio.to_thread(
+            client.models.generate_content,
             model="gemini-2.5-pro",
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -2053,14 +2193,6 @@ async def targeted_search(request: TargetedSearchRequest):
         graph_store.add_elements(new_nodes, new_edges)
 
         # Run community detection
-        try:
-            from api.graph_ops import compute_communities
-        except ImportError:
-            try:
-                from graph_ops import compute_communities
-            except ImportError:
-                compute_communities = None
-
         if compute_communities:
             graph_data = graph_store.load()
             graph_data = compute_communities(graph_data)
@@ -2087,37 +2219,58 @@ async def targeted_search(request: TargetedSearchRequest):
 
 @app.post("/api/upload")
 async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    temp_dir = tempfile.mkdtemp()
-    file_path = os.path.join(temp_dir, file.filename)
-    with open(file_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    background_tasks.add_task(process_upload, file_path, file.filename)
+    # Keep the PDF in memory: GCS upload, text extraction and vision OCR all work
+    # from the same bytes, instead of a temp-file copy that is re-read three times
+    pdf_bytes = await file.read()
+    background_tasks.add_task(process_upload, pdf_bytes, file.filename)
     return {"status": "Processing"}
 
-def extract_text_from_pdf(file_path, filename):
-    """Extract text from PDF, using Gemini vision for scanned/poor-quality pages."""
-    reader = PdfReader(file_path)
+_WORD_RE = re.compile(r"\S+")
+
+
+def _is_readable_page(text, min_words=10):
+    """True if text has min_words alphabetic words of 3+ letters.
+
+    Scans lazily and stops at the min_words-th hit, so a text-rich page costs a
+    few dozen tokens instead of a full split() of the page.
+    """
+    count = 0
+    for m in _WORD_RE.finditer(text):
+        word = m.group()
+        if len(word) > 2 and word.isalpha():
+            count += 1
+            if count >= min_words:
+                return True
+    return False
+
+
+def extract_text_from_pdf(pdf_bytes, filename):
+    """Extract text from PDF bytes, using Gemini vision for scanned/poor-quality pages."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = reader.pages
+    page_count = len(pages)
     all_text = []
+    raw_texts = []  # per-page pypdf text, reused by the fallback below
 
     # First pass: try standard text extraction
-    has_good_text = False
-    for page_num, page in enumerate(reader.pages):
+    for page_num, page in enumerate(pages):
         text = (page.extract_text() or "").strip()
-        clean_words = [w for w in text.split() if len(w) > 2 and w.isalpha()]
-        if len(clean_words) >= 10:
-            has_good_text = True
+        raw_texts.append(text)
+        if _is_readable_page(text):
             all_text.append({"text": text, "page": page_num + 1})
+        # Stop once the remaining pages can no longer reach the threshold —
+        # scanned PDFs go to Gemini anyway, so extracting the rest is wasted
+        if len(all_text) + (page_count - page_num - 1) <= page_count * 0.3:
+            break
 
     # If standard extraction found good text, use it
-    if has_good_text and len(all_text) > len(reader.pages) * 0.3:
+    if all_text and len(all_text) > page_count * 0.3:
         return all_text
 
     # Otherwise, use Gemini vision to read the scanned PDF directly
     print(f"DEBUG: Standard OCR insufficient for {filename}, using Gemini vision...")
     all_text = []
     try:
-        with open(file_path, "rb") as f:
-            pdf_bytes = f.read()
         response = client.models.generate_content(
             model="gemini-2.5-pro",
             contents=[
@@ -2130,9 +2283,9 @@ def extract_text_from_pdf(file_path, filename):
             all_text.append({"text": full_text, "page": 1})
     except Exception as e:
         print(f"DEBUG: Gemini vision OCR failed for {filename}: {e}")
-        # Fall back to whatever pypdf got
-        for page_num, page in enumerate(reader.pages):
-            text = (page.extract_text() or "").strip()
+        # Fall back to whatever pypdf got, extracting only pages the first pass skipped
+        raw_texts.extend((page.extract_text() or "").strip() for page in pages[len(raw_texts):])
+        for page_num, text in enumerate(raw_texts):
             if text:
                 all_text.append({"text": text, "page": page_num + 1})
 
@@ -2192,72 +2345,117 @@ def _dual_write_chunks_to_supabase(batch):
         print(f"DEBUG: Supabase dual-write failed (non-fatal): {e}")
 
 
-def process_upload(file_path, filename):
-    try:
-        if not bucket:
-            print(f"Error: GCS bucket not initialized. Could not upload {filename}.")
-            return
-        if not client:
-            print(f"Error: GenAI client not initialized. Could not index {filename}.")
-            return
-        if not index:
-            print(f"Error: Pinecone index not initialized. Could not index {filename}.")
-            return
+# GCS copies of uploaded PDFs are written here so text extraction and embedding
+# don't wait on the upload
+_gcs_upload_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gcs-upload")
+
+# Per-chunk Gemini Flash metadata calls for uploads run here concurrently
+# instead of one blocking round-trip after another
+_chunk_metadata_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chunk-metadata")
+
+
+def process_upload(pdf_bytes, filename):
+    if not bucket:
+        print(f"Error: GCS bucket not initialized. Could not upload {filename}.")
+        return
+    if not client:
+        print(f"Error: GenAI client not initialized. Could not index {filename}.")
+        return
+    if not index:
+        print(f"Error: Pinecone index not initialized. Could not index {filename}.")
+        return
 
-        blob = bucket.blob(f"uploads/{filename}")
-        blob.upload_from_filename(file_path)
+    # The GCS copy doubles as the ingest ledger: once a file is fully indexed its
+    # blob is tagged with indexed_sha256, so re-uploading identical bytes is a no-op
+    pdf_sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+    existing = bucket.get_blob(f"uploads/{filename}")
+    if existing is not None and (existing.metadata or {}).get("indexed_sha256") == pdf_sha256:
+        print(f"DEBUG: {filename} already indexed with identical content, skipping")
+        return
 
-        pages = extract_text_from_pdf(file_path, filename)
-        print(f"DEBUG: Extracted {len(pages)} pages from {filename}")
+    blob = bucket.blob(f"uploads/{filename}")
+    blob.metadata = {"sha256": pdf_sha256}
+    upload_future = _gcs_upload_pool.submit(blob.upload_from_string, pdf_bytes, content_type="application/pdf")
 
-        UPLOAD_CHUNK_SIZE = 1500
-        UPLOAD_CHUNK_OVERLAP = 200
-        UPSERT_BATCH_SIZE = 100
+    def wait_for_upload():
+        # Returns at once after the first call; a failed upload raises every time
+        try:
+            upload_future.result()
+        except Exception as e:
+            print(f"Error: GCS upload failed for {filename}: {e}")
+            raise
+
+    pages = extract_text_from_pdf(pdf_bytes, filename)
+    print(f"DEBUG: Extracted {len(pages)} pages from {filename}")
+
+    UPLOAD_CHUNK_SIZE = 1500
+    UPLOAD_CHUNK_OVERLAP = 200
+    UPSERT_BATCH_SIZE = 100
+
+    # (vec_id, chunk, page) for every chunk in the document
+    chunks = []
+    for page_data in pages:
+        text = page_data["text"]
+        page_num = page_data["page"]
+        start = 0
+        i = 0
+        while start < len(text):
+            chunk = text[start:start + UPLOAD_CHUNK_SIZE].strip()
+            if chunk:
+                chunks.append((f"{filename}-p{page_num}-{i}", chunk, page_num))
+                i += 1
+            start += UPLOAD_CHUNK_SIZE - UPLOAD_CHUNK_OVERLAP
+
+    # One embed_content call and one upsert per batch instead of one call per chunk
+    complete = bool(chunks)  # every batch embedded and upserted
+    for batch_start in range(0, len(chunks), UPSERT_BATCH_SIZE):
+        group = chunks[batch_start:batch_start + UPSERT_BATCH_SIZE]
+        # Start the metadata calls first so they overlap the embedding call
+        meta_futures = [_chunk_metadata_pool.submit(_extract_chunk_metadata, chunk) for _, chunk, _ in group]
+        embeddings = None
+        for attempt in range(3):
+            try:
+                res = client.models.embed_content(
+                    model="gemini-embedding-001", contents=[chunk for _, chunk, _ in group]
+                )
+                embeddings = [e.values for e in res.embeddings]
+                break
+            except Exception as e:
+                if attempt < 2:
+                    wait = (attempt + 1) * 5
+                    print(f"    Embed retry {attempt+1} for {group[0][0]}..{group[-1][0]} (waiting {wait}s): {e}")
+                    time.sleep(wait)
+                else:
+                    print(f"    FAILED to embed {group[0][0]}..{group[-1][0]}: {e}")
+        if embeddings is None:
+            complete = False
+            for future in meta_futures:
+                future.cancel()
+            continue
 
         batch = []
-        for page_data in pages:
-            text = page_data["text"]
-            page_num = page_data["page"]
-            start = 0
-            i = 0
-            while start < len(text):
-                chunk = text[start:start + UPLOAD_CHUNK_SIZE].strip()
-                if chunk:
-                    vec_id = f"{filename}-p{page_num}-{i}"
-
-                    # Extract enriched metadata
-                    enriched = _extract_chunk_metadata(chunk)
-
-                    for attempt in range(3):
-                        try:
-                            res = client.models.embed_content(model="gemini-embedding-001", contents=[chunk])
-                            meta = {
-                                "text": chunk, "filename": filename, "page": page_num,
-                                "gcs_path": f"gs://{GCS_BUCKET}/uploads/{filename}",
-                            }
-                            meta.update(enriched)
-                            batch.append((vec_id, res.embeddings[0].values, meta))
-                            break
-                        except Exception as e:
-                            if attempt < 2:
-                                wait = (attempt + 1) * 5
-                                print(f"    Embed retry {attempt+1} for {vec_id} (waiting {wait}s): {e}")
-                                import time; time.sleep(wait)
-                            else:
-                                print(f"    FAILED to embed {vec_id}: {e}")
-                    if len(batch) >= UPSERT_BATCH_SIZE:
-                        index.upsert(vectors=batch)
-                        _dual_write_chunks_to_supabase(batch)
-                        batch = []
-                    i += 1
-                start += UPLOAD_CHUNK_SIZE - UPLOAD_CHUNK_OVERLAP
-
-        if batch:
-            index.upsert(vectors=batch)
-            _dual_write_chunks_to_supabase(batch)
-        print(f"DEBUG: Finished indexing {filename}")
-    finally:
-        shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+        for (vec_id, chunk, page_num), values, meta_future in zip(group, embeddings, meta_futures):
+            meta = {
+                "text": chunk, "filename": filename, "page": page_num,
+                "gcs_path": f"gs://{GCS_BUCKET}/uploads/{filename}",
+            }
+            # Extract enriched metadata
+            meta.update(meta_future.result())
+            batch.append((vec_id, values, meta))
+        # No vectors may point at a GCS copy that never landed; extraction and
+        # the first embed call have already overlapped the upload by now
+        wait_for_upload()
+        index.upsert(vectors=batch)
+        _dual_write_chunks_to_supabase(batch)
+
+    wait_for_upload()
+    if complete:
+        try:
+            blob.metadata = {"sha256": pdf_sha256, "indexed_sha256": pdf_sha256}
+            blob.patch()
+        except Exception as e:
+            print(f"DEBUG: Could not record indexed_sha256 for {filename}: {e}")
+    print(f"DEBUG: Finished indexing {filename}")
 
 @app.get("/api/scrape-progress")
 async def get_scrape_progress():
@@ -2291,14 +2489,8 @@ async def get_datasets():
 
 @app.post("/api/graph/communities")
 async def detect_communities():
-    try:
-        from api.graph_ops import compute_communities
-    except ImportError:
-        try:
-            from graph_ops import compute_communities
-        except ImportError as e:
-            print(f"DEBUG: graph_ops unavailable: {e}")
-            return {"error": f"networkx not installed: {e}"}
+    if compute_communities is None:
+        return {"error": "graph_ops unavailable"}
     try:
         graph_data = graph_store.load()
         graph_data = compute_communities(graph_data)
@@ -2335,11 +2527,11 @@ async def deduplicate_graph():
 
     try:
         # Load raw nodes and edges from Supabase
-        raw_nodes = graph_store._fetch_all("nodes")
-        raw_edges = graph_store._fetch_all("edges")
+        raw_nodes = await asyncio.to_thread(graph_store._fetch_all, "nodes")
+        raw_edges = await asyncio.to_thread(graph_store._fetch_all, "edges")
 
         if not raw_nodes:
-            return {"merged": 0, "removed_nodes": 0, "removed_edges": 0, **graph_store.load()}
+            return {"merged": 0, "removed_nodes": 0, "removed_edges": 0, **(await asyncio.to_thread(graph_store.load))}
 
         # --- Pass 1: Heuristic merge by (normalized_label, type) ---
         def normalize(s):
@@ -2407,7 +2599,8 @@ async def deduplicate_graph():
                 )
 
                 try:
-                    res = client.models.generate_content(
+                    res = await asyncio.to_thread(
+                        client.models.generate_content,
                         model="gemini-2.0-flash",
                         contents=merge_prompt,
                         config=types.GenerateContentConfig(
@@ -2457,25 +2650,25 @@ async def deduplicate_graph():
         duplicate_ids = [old for old, _ in remap_pairs]
 
         if not duplicate_ids:
-            return {"merged": 0, "removed_nodes": 0, "removed_edges": 0, **graph_store.load()}
+            return {"merged": 0, "removed_nodes": 0, "removed_edges": 0, **(await asyncio.to_thread(graph_store.load))}
 
         # --- Edge rewiring in Supabase (before deleting nodes due to FK) ---
         CHUNK = 100
         for i in range(0, len(remap_pairs), CHUNK):
             chunk = remap_pairs[i:i + CHUNK]
             for old_id, canonical_id in chunk:
-                supabase.table("edges").update({"source": canonical_id}).eq("source", old_id).execute()
-                supabase.table("edges").update({"target": canonical_id}).eq("target", old_id).execute()
+                await asyncio.to_thread(supabase.table("edges").update({"source": canonical_id}).eq("source", old_id).execute)
+                await asyncio.to_thread(supabase.table("edges").update({"target": canonical_id}).eq("target", old_id).execute)
 
         # Delete self-loop edges
-        self_loops = supabase.table("edges").select("id, source, target").execute()
+        self_loops = await asyncio.to_thread(supabase.table("edges").select("id, source, target").execute)
         self_loop_ids = [e["id"] for e in (self_loops.data or []) if e["source"] == e["target"]]
         for i in range(0, len(self_loop_ids), CHUNK):
             chunk = self_loop_ids[i:i + CHUNK]
-            supabase.table("edges").delete().in_("id", chunk).execute()
+            await asyncio.to_thread(supabase.table("edges").delete().in_("id", chunk).execute)
 
         # Delete duplicate edges (same source+predicate+target, keep first)
-        all_edges_now = graph_store._fetch_all("edges")
+        all_edges_now = await asyncio.to_thread(graph_store._fetch_all, "edges")
         seen_edge_keys = {}
         dup_edge_ids = []
         for e in all_edges_now:
@@ -2486,7 +2679,7 @@ async def deduplicate_graph():
                 seen_edge_keys[key] = e["id"]
         for i in range(0, len(dup_edge_ids), CHUNK):
             chunk = dup_edge_ids[i:i + CHUNK]
-            supabase.table("edges").delete().in_("id", chunk).execute()
+            await asyncio.to_thread(supabase.table("edges").delete().in_("id", chunk).execute)
 
         removed_edges = len(self_loop_ids) + len(dup_edge_ids)
 
@@ -2502,13 +2695,16 @@ async def deduplicate_graph():
             })
         for i in range(0, len(canonical_records), CHUNK):
             chunk = canonical_records[i:i + CHUNK]
-            supabase.table("nodes").upsert(chunk, on_conflict="id").execute()
+            await asyncio.to_thread(supabase.table("nodes").upsert(chunk, on_conflict="id").execute)
 
         for i in range(0, len(duplicate_ids), CHUNK):
             chunk = duplicate_ids[i:i + CHUNK]
-            supabase.table("edges").delete().in_("source", chunk).execute()
-            supabase.table("edges").delete().in_("target", chunk).execute()
-            supabase.table("nodes").delete().in_("id", chunk).execute()
+            await asyncio.to_thread(supabase.table("edges").delete().in_("source", chunk).execute)
+            await asyncio.to_thread(supabase.table("edges").delete().in_("target", chunk).execute)
+            await asyncio.to_thread(supabase.table("nodes").delete().in_("id", chunk).execute)
+
+        if invalidate_graph_cache:
+            invalidate_graph_cache()
 
         merge_count = heuristic_removed + gemini_merges
         print(f"Dedup complete: {merge_count} merges, {len(duplicate_ids)} nodes removed, {removed_edges} edges cleaned")
@@ -2517,7 +2713,7 @@ async def deduplicate_graph():
             "merged": merge_count,
             "removed_nodes": len(duplicate_ids),
             "removed_edges": removed_edges,
-            **graph_store.load()
+            **(await asyncio.to_thread(graph_store.load))
         }
     except Exception as e:
         print(f"Deduplication failed: {e}")
@@ -9,42 +9,266 @@ Yields SSE events as it progresses through phases:
   F) Synthesis (streamed)
 """
 
-import json
-import queue as _queue
+import copy
+import os
+import time
+import hashlib
 import traceback
 import asyncio
+import atexit
 import re
 import urllib.parse
-from typing import AsyncGenerator
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
+from typing import AsyncGenerator, Iterable
 
+import orjson
 from google.genai import types
 
+try:
+    from api.graph_ops import lookup_entity_intel, bfs_collect_evidence, keyword_search_evidence
+except ImportError:
+    from graph_ops import lookup_entity_intel, bfs_collect_evidence, keyword_search_evidence
+
+# Shared pool for the pipeline's blocking calls (Pinecone, Supabase, Gemini JSON),
+# reused across requests instead of going through asyncio.to_thread
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="investigator")
+atexit.register(_EXECUTOR.shutdown, wait=False)
+
+# Report and follow-up models; override per deployment to trade quality for latency
+SYNTHESIS_MODEL = os.getenv("SYNTHESIS_MODEL", "gemini-2.0-flash").strip()
+FOLLOWUP_MODEL = os.getenv("FOLLOWUP_MODEL", "gemini-2.0-flash").strip()
+
+_WS_RE = re.compile(r'\s+')
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+# Parsed JSON responses keyed by blake2b(model + prompt) -> (timestamp, result)
+_GENAI_JSON_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_GENAI_JSON_CACHE_MAX = 512
+_GENAI_JSON_CACHE_TTL = 600  # seconds
+_GENAI_JSON_ATTEMPTS = 3  # re-ask when the response doesn't parse
+
+# Streamed report text is coalesced into events of at least this many chars,
+# or whatever arrived once this long has passed since the last event
+_TEXT_FLUSH_CHARS = 40
+_TEXT_FLUSH_SECS = 0.05
+
+# Longest the stream waits on the follow-up call after the report and sources
+# have been sent; past this the follow_ups event is dropped rather than delay "done"
+_FOLLOWUP_WAIT_SECS = 3.0
+
+# Report chunks the synthesis producer may read ahead of the SSE consumer
+_SYNTHESIS_QUEUE_MAX = 64
+_STREAM_END = object()
+
+# Upper bound on document excerpt characters sent to synthesis; chunks are kept
+# in pass order (Pass 1 first), so later, lower-priority passes are dropped first
+_CONTEXT_CHAR_BUDGET = 40000
+_CONTEXT_SEP = "\n\n---\n\n"
+
+_MAX_CONTEXT_CHUNKS = 40  # unique chunks kept across all search passes
+_MAX_SOURCES = 20  # document sources listed alongside the report
+
+
+ANALYSIS_PROMPT_TEMPLATE = (
+    "You are an investigative intelligence analyst. Analyze this query and extract structured information.\n\n"
+    "RULES:\n"
+    '- "primary_entity" MUST be a specific named person, organization, or location mentioned in the query. '
+    "Generic words like 'network', 'individuals', 'transactions', 'documents' are NOT entities. "
+    "If the query does not mention a specific named entity, set primary_entity to an empty string.\n"
+    '- "secondary_entities": other specific named entities mentioned or implied (list of strings, empty if none)\n'
+    '- "key_terms": important search terms and phrases for document retrieval (list of strings)\n'
+    '- "reformulated_queries": 2-3 alternative phrasings to find relevant documents (list of strings)\n'
+    '- "candidate_followups": 3-4 specific follow-up questions that would deepen this investigation, '
+    "focused on unexplored connections, missing evidence, or related entities (list of strings)\n\n"
+    "Query: {query}\n\n"
+    "Return JSON only."
+)
+
+SYNTHESIS_PROMPT_TEMPLATE = (
+    "You are an elite investigative intelligence analyst writing a comprehensive investigative report.\n\n"
+    "CONTEXT (documents, graph intelligence, entity profiles):\n"
+    "{context}\n\n"
+    "INVESTIGATION QUERY: {query}\n\n"
+    "Write a thorough investigative report with these sections:\n"
+    "## Executive Summary\nBrief overview of key findings.\n\n"
+    "## Key Connections\nImportant relationships and links discovered.\n\n"
+    "## Document Evidence\nSpecific evidence from source documents with citations [Source: filename].\n\n"
+    "## Timeline\nChronological events if dates are available.\n\n"
+    "## Assessment\nAnalytical assessment of the findings.\n\n"
+    "Cite sources using [Source: filename] tags. Be thorough but precise.\n\n"
+    "{source_rules}"
+)
+
+_WEB_SOURCE_RULES = (
+    "Prioritize evidence from the provided document context above. "
+    "If the documents are insufficient to fully answer the query, supplement with Google Search. "
+    "Prefix any web-sourced information with [Web]. "
+    "Always clearly distinguish document evidence from web-sourced information."
+)
+
+_FILES_ONLY_SOURCE_RULES = (
+    "ONLY use information from the provided context. "
+    "Do not fabricate information not supported by the provided context. "
+    "If the provided context is insufficient to fully answer the query, explicitly state what information is missing rather than speculating."
+)
+
+FOLLOWUP_PROMPT_TEMPLATE = (
+    "Based on this investigation about '{query}', suggest 3-4 specific follow-up questions "
+    "that would deepen the investigation. Focus on unexplored connections, missing evidence, "
+    "or related entities. Return JSON array of strings.\n\n"
+    "Key entities found: {entities}\n"
+    "Relationships: {relationships}"
+)
+
+
+def _to_exec(fn, /, *args, **kwargs) -> asyncio.Future:
+    """Schedule a blocking call on the investigator pool; the returned future is already running."""
+    return asyncio.get_running_loop().run_in_executor(_EXECUTOR, partial(fn, *args, **kwargs))
+
+
+def _sse(event_type: str, data: dict) -> bytes:
+    """Format a server-sent event as ready-to-send bytes."""
+    if not data:
+        return _sse_bare(event_type)
+    return b"data: " + orjson.dumps({'type': event_type, **data}) + b"\n\n"
+
+
+@lru_cache(maxsize=16)
+def _sse_bare(event_type: str) -> bytes:
+    """Payload-free events (e.g. "done") are constant, so they're encoded once."""
+    return b"data: " + orjson.dumps({'type': event_type}) + b"\n\n"
+
+
+@lru_cache(maxsize=64)
+def _step_status_head(step: str, label: str, status: str) -> bytes:
+    """Constant leading bytes of a step_status event (closing brace left off)."""
+    return b"data: " + orjson.dumps({"type": "step_status", "step": step, "label": label, "status": status})[:-1]
+
+
+def _step_status(step: str, label: str, status: str, detail: str = None) -> bytes:
+    """step_status event; only the detail varies per call, so the rest is cached."""
+    head = _step_status_head(step, label, status)
+    if detail is None:
+        return head + b"}\n\n"
+    return head + b',"detail":' + orjson.dumps(detail) + b"}\n\n"
+
+
+_SSE_TEXT_PREFIX = b'data: {"type":"text","text":'
+
+
+def _sse_text(text: str) -> bytes:
+    """Fast path for streamed text events: only the text itself is serialized."""
+    return _SSE_TEXT_PREFIX + orjson.dumps(text) + b"}\n\n"
+
+
+def _extract_json(text: str, expect: type = None) -> str:
+    """
+    Robustly extract JSON from model output: strip ```json fences, then return the
+    first balanced object or array. Single linear scan tracking bracket depth and
+    string state, so braces inside strings or trailing prose don't confuse it.
+    With expect=dict or expect=list the scan starts at the first matching opener,
+    so a stray bracket in leading prose isn't mistaken for the payload.
+    """
+    text = _FENCE_RE.sub('', text.strip())
+    if expect is dict:
+        starts = [text.find('{')]
+    elif expect is list:
+        starts = [text.find('[')]
+    else:
+        starts = [text.find('{'), text.find('[')]
+    starts = [i for i in starts if i >= 0]
+    if not starts:
+        return text
+    start = min(starts)
+    depth, in_str, esc = 0, False, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == '\\':
+                esc = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in '{[':
+            depth += 1
+        elif ch in '}]':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text
+
+
+async def _cached_generate_json(genai_client, prompt: str, model: str = "gemini-2.0-flash",
+                                expect: type = dict):
+    """
+    JSON-mode generate_content call, memoized by prompt hash.
+    Repeat prompts within the TTL skip the Gemini round-trip entirely.
+    Unparseable responses, or ones that aren't of type `expect`, are retried with
+    backoff; only valid ones are cached.
+    """
+    key = hashlib.blake2b(f"{model}\0{prompt}".encode(), digest_size=16).hexdigest()
+    now = time.monotonic()
+    hit = _GENAI_JSON_CACHE.get(key)
+    if hit is not None:
+        if now - hit[0] < _GENAI_JSON_CACHE_TTL:
+            _GENAI_JSON_CACHE.move_to_end(key)
+            return copy.deepcopy(hit[1])
+        del _GENAI_JSON_CACHE[key]
+
+    for attempt in range(_GENAI_JSON_ATTEMPTS):
+        res = await _to_exec(
+            genai_client.models.generate_content,
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(response_mime_type="application/json"),
+        )
+        try:
+            result = orjson.loads(_extract_json(res.text or "", expect=expect))
+            if not isinstance(result, expect):
+                raise ValueError(f"expected a JSON {expect.__name__}, got {type(result).__name__}")
+            break
+        except (orjson.JSONDecodeError, ValueError) as e:
+            if attempt == _GENAI_JSON_ATTEMPTS - 1:
+                raise
+            print(f"DEBUG: Unparseable JSON from {model} (attempt {attempt + 1}): {e}")
+            await asyncio.sleep(0.5 * 2 ** attempt)
 
-def _sse(event_type: str, data: dict) -> str:
-    """Format a server-sent event."""
-    return f"data: {json.dumps({'type': event_type, **data})}\n\n"
+    _GENAI_JSON_CACHE[key] = (now, result)
+    _GENAI_JSON_CACHE.move_to_end(key)
+    while len(_GENAI_JSON_CACHE) > _GENAI_JSON_CACHE_MAX:
+        _GENAI_JSON_CACHE.popitem(last=False)
+    return copy.deepcopy(result)
 
 
-def _extract_json(text: str) -> str:
-    """Robustly extract JSON from model output."""
-    match = re.search(r'\{.*\}', text, re.DOTALL)
-    if match:
-        return match.group(0)
-    return text
+def _string_list(value) -> list:
+    """Stripped, non-empty strings from a model-provided list field; anything else (null, a bare string) gives []."""
+    if not isinstance(value, list):
+        return []
+    return [s.strip() for s in value if isinstance(s, str) and s.strip()]
+
+
+def _text_digest(text: str) -> int:
+    """64-bit digest of the whitespace-normalized full chunk text, for dedup."""
+    normalized = _WS_RE.sub(' ', text).strip()
+    return int.from_bytes(hashlib.blake2b(normalized.encode(), digest_size=8).digest(), "little")
 
 
 def _truncate_at_sentence(text: str, max_len: int = 1200) -> str:
     """Truncate text at the last sentence boundary before max_len."""
     if len(text) <= max_len:
         return text
-    truncated = text[:max_len]
-    # Find the last sentence-ending punctuation
-    last_period = truncated.rfind('.')
-    last_newline = truncated.rfind('\n')
-    boundary = max(last_period, last_newline)
+    # Find the last sentence-ending punctuation; bounded rfind scans in C
+    # without materializing an intermediate max_len slice first
+    boundary = max(text.rfind('.', 0, max_len), text.rfind('\n', 0, max_len))
     if boundary > max_len // 2:
-        return truncated[:boundary + 1]
-    return truncated
+        return text[:boundary + 1]
+    return text[:max_len]
 
 
 def _safe_semantic_pass(semantic_search_fn, query_text, genai_client, pinecone_index,
@@ -67,6 +291,24 @@ def _safe_semantic_pass(semantic_search_fn, query_text, genai_client, pinecone_i
         return [], err
 
 
+def _safe_semantic_batch(semantic_search_batch_fn, queries, genai_client, pinecone_index, rerank_fn=None):
+    """
+    Wrapper around semantic_search_batch_fn with detailed error capture.
+    Returns (list of result lists, error); on failure every slot is an empty list.
+    """
+    try:
+        return semantic_search_batch_fn(
+            queries=queries,
+            genai_client=genai_client,
+            pinecone_index=pinecone_index,
+            rerank_fn=rerank_fn,
+        ), None
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"
+        print(f"DEBUG: Batched semantic search failed: {err}")
+        return [[] for _ in queries], err
+
+
 async def run_investigation(
     query: str,
     genai_client,
@@ -76,12 +318,19 @@ async def run_investigation(
     rerank_fn=None,
     case_context: dict = None,
     mode: str = "files_only",
-) -> AsyncGenerator[str, None]:
+    semantic_search_batch_fn=None,
+    synthesis_model: str = None,
+    include_followups: bool = True,
+) -> AsyncGenerator[bytes, None]:
     """
     Async generator that runs a multi-step investigation and yields SSE events.
     Optional case_context dict enriches the query with case-specific info:
       { title, summary, entities, suggested_questions }
     mode: "files_only" (strict document-only) or "files_web" (supplement with Google Search)
+    semantic_search_batch_fn: optional batched variant of semantic_search_fn; when
+      given, independent search passes share one embedding call.
+    synthesis_model: Gemini model that streams the report; defaults to SYNTHESIS_MODEL.
+    include_followups: when False, no follow-up questions are generated or emitted.
     """
     # If case context provided, enrich the query
     if case_context:
@@ -89,11 +338,11 @@ async def run_investigation(
         if case_context.get("summary"):
             enriched_parts.append(f"Case background: {case_context['summary']}")
         if case_context.get("entities"):
-            enriched_parts.append(f"Key entities: {', '.join(case_context['entities'][:10])}")
+            enriched_parts.append(f"Key entities: {', '.join(islice(case_context['entities'], 10))}")
         if case_context.get("suggested_questions"):
-            enriched_parts.append(f"Investigation angles: {'; '.join(case_context['suggested_questions'][:4])}")
+            enriched_parts.append(f"Investigation angles: {'; '.join(islice(case_context['suggested_questions'], 4))}")
         if case_context.get("notes"):
-            notes_list = "\n- ".join(case_context["notes"][:20])
+            notes_list = "\n- ".join(islice(case_context["notes"], 20))
             enriched_parts.append(f"Investigator notes:\n- {notes_list}")
         if case_context.get("network_entities"):
             ent_lines = []
@@ -103,7 +352,7 @@ async def run_investigation(
                     line += f": {ent['description'][:200]}"
                 if ent.get("aliases"):
                     aliases = ent["aliases"] if isinstance(ent["aliases"], list) else [ent["aliases"]]
-                    line += f" [aliases: {', '.join(aliases[:5])}]"
+                    line += f" [aliases: {', '.join(islice(aliases, 5))}]"
                 ent_lines.append(line)
             enriched_parts.append("Network map entities:\n- " + "\n- ".join(ent_lines))
         if case_context.get("network_relationships"):
@@ -121,12 +370,15 @@ async def run_investigation(
         async for event in _run_investigation_inner(
             query, genai_client, pinecone_index, supabase_client,
             semantic_search_fn, rerank_fn, mode=mode,
+            semantic_search_batch_fn=semantic_search_batch_fn,
+            synthesis_model=synthesis_model or SYNTHESIS_MODEL,
+            include_followups=include_followups,
         ):
             yield event
     except Exception as e:
         tb = traceback.format_exc()
         print(f"CRITICAL: Investigation pipeline crashed: {tb}")
-        yield _sse("text", {"text": f"\n\n**Pipeline error:** {type(e).__name__}: {e}"})
+        yield _sse_text(f"\n\n**Pipeline error:** {type(e).__name__}: {e}")
         yield _sse("done", {})
 
 
@@ -138,63 +390,108 @@ async def _run_investigation_inner(
     semantic_search_fn,
     rerank_fn=None,
     mode: str = "files_only",
-) -> AsyncGenerator[str, None]:
+    semantic_search_batch_fn=None,
+    synthesis_model: str = SYNTHESIS_MODEL,
+    include_followups: bool = True,
+) -> AsyncGenerator[bytes, None]:
     all_context_chunks = []
-    all_sources = []
-    seen_texts = set()
+    seen_hashes: set[int] = set()  # _text_digest() of each retained chunk
+    seen_chunk_ids = set()
     entity_intel = {}
     graph_evidence = []
     discovered_entities = []
     discovered_relationships = []
     errors_log = []
 
-    def _add_chunks(chunks: list):
-        if not isinstance(chunks, list):
+    def _add_chunks(chunks: Iterable[dict], budget: int = _MAX_CONTEXT_CHUNKS):
+        # Any iterable of chunk dicts; stops consuming once the chunk budget is hit
+        if chunks is None or isinstance(chunks, (str, bytes, dict)):
             return
         for c in chunks:
+            if len(all_context_chunks) >= budget:
+                return
             if not isinstance(c, dict) or "text" not in c:
                 continue
-            sig = re.sub(r'\s+', ' ', c["text"][:500]).strip()
-            if sig not in seen_texts:
-                seen_texts.add(sig)
+            # Same dict object already kept from an earlier pass; ids are only
+            # recorded for retained chunks so they can't be recycled
+            if id(c) in seen_chunk_ids:
+                continue
+            h = _text_digest(c["text"])
+            if h not in seen_hashes:
+                seen_hashes.add(h)
+                seen_chunk_ids.add(id(c))
                 all_context_chunks.append(c)
 
+    # Request-scoped memo of semantic search results. Values are tasks so identical
+    # lookups issued concurrently (e.g. a reformulation equal to the original query)
+    # share a single Pinecone round-trip.
+    search_cache: dict[tuple, asyncio.Future] = {}
+
+    def _search_key(q: dict, reranked: bool) -> tuple:
+        filter_json = orjson.dumps(q.get("pinecone_filter") or {}, option=orjson.OPT_SORT_KEYS)
+        return (q["query_text"], q["fetch_k"], q["rerank_top_n"], filter_json, reranked)
+
+    def _cached_search(q: dict, reranked: bool = True) -> asyncio.Future:
+        key = _search_key(q, reranked)
+        if key not in search_cache:
+            search_cache[key] = _to_exec(
+                _safe_semantic_pass,
+                semantic_search_fn, q["query_text"], genai_client, pinecone_index,
+                rerank_fn=rerank_fn if reranked else None,
+                fetch_k=q["fetch_k"], rerank_top_n=q["rerank_top_n"],
+                pinecone_filter=q.get("pinecone_filter"),
+            )
+        return search_cache[key]
+
+    async def _batch_slot(batch_task: asyncio.Future, i: int):
+        lists, err = await batch_task
+        return lists[i], err
+
+    def _schedule_searches(queries: list, reranked: bool = True) -> list:
+        """Cached task per query; cache misses share one batched call when available."""
+        if not semantic_search_batch_fn:
+            return [_cached_search(q, reranked) for q in queries]
+        keys = [_search_key(q, reranked) for q in queries]
+        missing = {}
+        for k, q in zip(keys, queries):
+            if k not in search_cache and k not in missing:
+                missing[k] = q
+        if missing:
+            batch_task = _to_exec(
+                _safe_semantic_batch,
+                semantic_search_batch_fn, list(missing.values()), genai_client, pinecone_index,
+                rerank_fn=rerank_fn if reranked else None,
+            )
+            for i, k in enumerate(missing):
+                search_cache[k] = asyncio.create_task(_batch_slot(batch_task, i))
+        return [search_cache[k] for k in keys]
+
+    def _names_query(names: list) -> dict:
+        # One Pinecone query covers every name via $in instead of one query per name
+        return {
+            "query_text": " ".join(names), "fetch_k": 30, "rerank_top_n": 10,
+            "pinecone_filter": {"people": {"$in": names}},
+        }
+
     # ---------------------------------------------------------------
     # Phase A: Query Analysis
     # ---------------------------------------------------------------
-    yield _sse("step_status", {"step": "query_analysis", "label": "Analyzing Query", "status": "running"})
-    await asyncio.sleep(0.1) # Flush
+    yield _step_status("query_analysis", "Analyzing Query", "running")
+    await asyncio.sleep(0)  # Flush
+
+    # Pass 1 of Phase D only needs the raw query, so it runs alongside the analysis call
+    _cached_search({"query_text": query, "fetch_k": 50, "rerank_top_n": 5})
 
     analysis_failed = False
     try:
-        analysis_prompt = (
-            "You are an investigative intelligence analyst. Analyze this query and extract structured information.\n\n"
-            "RULES:\n"
-            '- "primary_entity" MUST be a specific named person, organization, or location mentioned in the query. '
-            "Generic words like 'network', 'individuals', 'transactions', 'documents' are NOT entities. "
-            "If the query does not mention a specific named entity, set primary_entity to an empty string.\n"
-            '- "secondary_entities": other specific named entities mentioned or implied (list of strings, empty if none)\n'
-            '- "key_terms": important search terms and phrases for document retrieval (list of strings)\n'
-            '- "reformulated_queries": 2-3 alternative phrasings to find relevant documents (list of strings)\n\n'
-            f"Query: {query}\n\n"
-            "Return JSON only."
-        )
-
-        # Use asyncio.to_thread for blocking GenAI call
-        analysis_res = await asyncio.to_thread(
-            genai_client.models.generate_content,
-            model="gemini-2.0-flash",
-            contents=analysis_prompt,
-            config=types.GenerateContentConfig(response_mime_type="application/json"),
-        )
-
-        analysis_text = _extract_json(analysis_res.text)
-        analysis = json.loads(analysis_text)
+        analysis = await _cached_generate_json(genai_client, ANALYSIS_PROMPT_TEMPLATE.format(query=query))
 
         primary_entity = analysis.get("primary_entity", "").strip()
-        secondary_entities = analysis.get("secondary_entities", [])
+        # Optional list fields are coerced, so a malformed one can't discard the rest of the analysis
+        secondary_entities = _string_list(analysis.get("secondary_entities"))
         key_terms = analysis.get("key_terms", [])
         reformulated_queries = analysis.get("reformulated_queries", [])
+        candidate_followups = _string_list(analysis.get("candidate_followups"))
     except Exception as e:
         print(f"DEBUG: Query analysis failed: {e}")
         errors_log.append(f"Query Analysis: {type(e).__name__} — fell back to raw query")
@@ -203,12 +500,10 @@ async def _run_investigation_inner(
         secondary_entities = []
         key_terms = [query.strip()]
         reformulated_queries = []
+        candidate_followups = []
 
     if analysis_failed:
-        yield _sse("step_status", {
-            "step": "query_analysis", "label": "Analyzing Query", "status": "error",
-            "detail": f"Falling back to raw query",
-        })
+        yield _step_status("query_analysis", "Analyzing Query", "error", f"Falling back to raw query")
     else:
         detail_parts = []
         if primary_entity:
@@ -218,11 +513,34 @@ async def _run_investigation_inner(
         if not detail_parts:
             detail_parts.append("General query — using semantic search")
 
-        yield _sse("step_status", {
-            "step": "query_analysis", "label": "Analyzing Query", "status": "done",
-            "detail": ", ".join(detail_parts),
-        })
-    await asyncio.sleep(0.3) # Pacing
+        yield _step_status("query_analysis", "Analyzing Query", "done", ", ".join(detail_parts))
+
+    # Pass 2 uses Phase A's reformulations when there are any; otherwise it is
+    # built from discovered entities in Phase D.
+    reformulated = None
+    if len(reformulated_queries) >= 2:
+        reformulated = f"{reformulated_queries[0]} {reformulated_queries[1]}"
+    elif reformulated_queries:
+        reformulated = reformulated_queries[0]
+
+    # With a named entity, the raw query is also run pre-filtered to chunks tagged
+    # with that person: a precise pass ahead of the broad, unfiltered Pass 1
+    entity_filter = {"people": {"$in": [primary_entity]}} if primary_entity else None
+
+    # Searches that only depend on Phase A start now and overlap with the entity
+    # intel lookup and graph traversal: the entity pass, Pass 2 when already known,
+    # and the Phase E name lookup when Phase A already named all three entities it
+    # filters on. Phase D/E pick them up from the search cache.
+    early_passes = []
+    if entity_filter:
+        early_passes.append({"query_text": query, "fetch_k": 50, "rerank_top_n": 5, "pinecone_filter": entity_filter})
+    if reformulated:
+        early_passes.append({"query_text": reformulated, "fetch_k": 50, "rerank_top_n": 5})
+    if early_passes:
+        _schedule_searches(early_passes)
+    early_names = [n for n in [primary_entity, *secondary_entities[:2]] if n and len(n) > 2]
+    if len(early_names) == 3:
+        _schedule_searches([_names_query(list(dict.fromkeys(early_names)))], reranked=False)
 
     # ---------------------------------------------------------------
     # Phase B: Entity Intel
@@ -230,17 +548,13 @@ async def _run_investigation_inner(
     has_entity = bool(primary_entity)
 
     if has_entity:
-        yield _sse("step_status", {"step": "entity_intel", "label": "Entity Intelligence", "status": "running"})
-        await asyncio.sleep(0.1)
+        yield _step_status("entity_intel", "Entity Intelligence", "running")
+        await asyncio.sleep(0)
 
         try:
-            from api.graph_ops import lookup_entity_intel
-        except ImportError:
-            from graph_ops import lookup_entity_intel
-
-        try:
-            # Supabase call is blocking, use thread
-            entity_intel = await asyncio.to_thread(lookup_entity_intel, supabase_client, primary_entity)
+            # Supabase call is blocking, use thread; Pass 1 (and Pass 2 when
+            # analysis supplied reformulations) keep running on the pool meanwhile
+            entity_intel = await _to_exec(lookup_entity_intel, supabase_client, primary_entity)
             if entity_intel.get("found"):
                 discovered_entities = [
                     e.get("label", e.get("id", "")) for e in entity_intel.get("connected_entities", [])
@@ -252,99 +566,31 @@ async def _run_investigation_inner(
         except Exception as e:
             print(f"DEBUG: Entity intel failed: {e}")
             errors_log.append(f"Entity Intel: {type(e).__name__} — entity profile unavailable")
-            yield _sse("step_status", {"step": "entity_intel", "label": "Entity Intelligence", "status": "error", "detail": f"{type(e).__name__}: {e}"})
+            yield _step_status("entity_intel", "Entity Intelligence", "error", f"{type(e).__name__}: {e}")
             detail = None
 
         if detail is not None:
-            yield _sse("step_status", {"step": "entity_intel", "label": "Entity Intelligence", "status": "done", "detail": detail})
+            yield _step_status("entity_intel", "Entity Intelligence", "done", detail)
     else:
-        yield _sse("step_status", {"step": "entity_intel", "label": "Entity Intelligence", "status": "done", "detail": "Skipped — no named entity"})
-    
-    await asyncio.sleep(0.3)
+        yield _step_status("entity_intel", "Entity Intelligence", "done", "Skipped — no named entity")
 
     # ---------------------------------------------------------------
     # Phase C: Graph Traversal
     # ---------------------------------------------------------------
+    # Blocking Supabase/BFS call; it only needs Phase B, so the Phase D passes
+    # below are scheduled before it is awaited and run alongside it.
+    graph_task = None
     if entity_intel.get("found"):
-        yield _sse("step_status", {"step": "graph_traversal", "label": "Graph Traversal", "status": "running"})
-        await asyncio.sleep(0.1)
-
-        try:
-            from api.graph_ops import bfs_collect_evidence
-        except ImportError:
-            from graph_ops import bfs_collect_evidence
-
-        try:
-            # Blocking Supabase/BFS call
-            graph_evidence = await asyncio.to_thread(
-                bfs_collect_evidence, supabase_client, entity_intel["entity_id"], max_hops=2, max_edges=50
-            )
-            detail = f"Collected {len(graph_evidence)} edges across 2 hops"
-        except Exception as e:
-            print(f"DEBUG: Graph traversal failed: {e}")
-            errors_log.append(f"Graph Traversal: {type(e).__name__} — graph evidence unavailable")
-            graph_evidence = []
-            yield _sse("step_status", {"step": "graph_traversal", "label": "Graph Traversal", "status": "error", "detail": f"{type(e).__name__}: {e}"})
-            detail = None
-
-        if detail is not None:
-            yield _sse("step_status", {"step": "graph_traversal", "label": "Graph Traversal", "status": "done", "detail": detail})
-    else:
-        yield _sse("step_status", {"step": "graph_traversal", "label": "Graph Traversal", "status": "done", "detail": "Skipped"})
-
-    await asyncio.sleep(0.3)
+        graph_task = _to_exec(
+            bfs_collect_evidence, supabase_client, entity_intel["entity_id"], max_hops=2, max_edges=50
+        )
 
     # ---------------------------------------------------------------
     # Phase D: Multi-Pass Semantic Search
     # ---------------------------------------------------------------
-    yield _sse("step_status", {"step": "semantic_search", "label": "Research", "status": "running", "detail": "Starting pass 1..."})
-    await asyncio.sleep(0.1)
-
-    pass_count = 0
-    errors = []
-
-    # Pass 1: Original query
-    results, err = await asyncio.to_thread(
-        _safe_semantic_pass,
-        semantic_search_fn, query, genai_client, pinecone_index,
-        rerank_fn=rerank_fn, fetch_k=50, rerank_top_n=5,
-    )
-    if err:
-        errors.append(f"Pass 1: {err}")
-    else:
-        _add_chunks(results)
-        pass_count += 1
-
-    # Heartbeat
-    yield _sse("step_status", {"step": "semantic_search", "label": "Research", "status": "running",
-                "detail": f"Pass 1 {'OK' if not err else 'failed'} ({len(all_context_chunks)} chunks). Pass 2..."})
-    await asyncio.sleep(0.2)
-
     # Pass 2: Reformulated with discovered context
-    reformulated = None
-    if len(reformulated_queries) >= 2:
-        reformulated = f"{reformulated_queries[0]} {reformulated_queries[1]}"
-    elif reformulated_queries:
-        reformulated = reformulated_queries[0]
-    elif discovered_entities:
-        reformulated = f"{query} {' '.join(discovered_entities[:3])}"
-
-    if reformulated:
-        results, err = await asyncio.to_thread(
-            _safe_semantic_pass,
-            semantic_search_fn, reformulated, genai_client, pinecone_index,
-            rerank_fn=rerank_fn, fetch_k=50, rerank_top_n=5,
-        )
-        if err:
-            errors.append(f"Pass 2: {err}")
-        else:
-            _add_chunks(results)
-            pass_count += 1
-
-    # Heartbeat
-    yield _sse("step_status", {"step": "semantic_search", "label": "Research", "status": "running",
-                "detail": f"{pass_count} passes ({len(all_context_chunks)} chunks)"})
-    await asyncio.sleep(0.2)
+    if reformulated is None and discovered_entities:
+        reformulated = f"{query} {' '.join(islice(discovered_entities, 3))}"
 
     # Pass 3 (conditional): Focused on most important connected entity, or unused reformulation
     top_connected = None
@@ -361,14 +607,63 @@ async def _run_investigation_inner(
     elif len(reformulated_queries) >= 2 and not top_connected:
         pass3_query = reformulated_queries[1]
 
+    # (label, query_text, fetch_k, rerank_top_n, pinecone_filter) — passes are
+    # independent, so they all run concurrently. Pass 1 has been in flight since
+    # Phase A started; the entity pass and Pass 2 since it finished when known early.
+    # The filtered entity pass merges first so its chunks win the context budget.
+    passes = []
+    if entity_filter:
+        passes.append(("Entity pass", query, 50, 5, entity_filter))
+    passes.append(("Pass 1", query, 50, 5, None))
+    if reformulated:
+        passes.append(("Pass 2", reformulated, 50, 5, None))
     if pass3_query:
-        results, err = await asyncio.to_thread(
-            _safe_semantic_pass,
-            semantic_search_fn, pass3_query, genai_client, pinecone_index,
-            rerank_fn=rerank_fn, fetch_k=40, rerank_top_n=5,
-        )
+        passes.append(("Pass 3", pass3_query, 40, 5, None))
+
+    # Early passes are served from the search cache; the rest share one embedding call
+    pass_tasks = _schedule_searches([
+        {"query_text": q, "fetch_k": fk, "rerank_top_n": rk, "pinecone_filter": pf}
+        for _, q, fk, rk, pf in passes
+    ])
+
+    # Graph traversal results (Phase C). Nothing is yielded until every search
+    # above is in flight, so a slow SSE consumer can't delay starting them.
+    if graph_task is not None:
+        yield _step_status("graph_traversal", "Graph Traversal", "running")
+        try:
+            graph_evidence = await graph_task
+            detail = f"Collected {len(graph_evidence)} edges across 2 hops"
+        except Exception as e:
+            print(f"DEBUG: Graph traversal failed: {e}")
+            errors_log.append(f"Graph Traversal: {type(e).__name__} — graph evidence unavailable")
+            graph_evidence = []
+            yield _step_status("graph_traversal", "Graph Traversal", "error", f"{type(e).__name__}: {e}")
+            detail = None
+
+        if detail is not None:
+            yield _step_status("graph_traversal", "Graph Traversal", "done", detail)
+    else:
+        yield _step_status("graph_traversal", "Graph Traversal", "done", "Skipped")
+
+    yield _step_status("semantic_search", "Research", "running", f"Running {len(passes)} passes...")
+    await asyncio.sleep(0)
+
+    async def _indexed(i: int, task: asyncio.Future):
+        return i, await task
+
+    # Report each pass as it lands; results are still merged in pass order below
+    pass_results = [None] * len(passes)
+    for n, fut in enumerate(asyncio.as_completed([_indexed(i, t) for i, t in enumerate(pass_tasks)]), 1):
+        i, pass_results[i] = await fut
+        if n < len(passes):
+            yield _step_status("semantic_search", "Research", "running", f"{passes[i][0]} complete ({n}/{len(passes)})")
+
+    # Merge in pass order so dedup stays deterministic
+    pass_count = 0
+    errors = []
+    for (label, *_), (results, err) in zip(passes, pass_results):
         if err:
-            errors.append(f"Pass 3: {err}")
+            errors.append(f"{label}: {err}")
         else:
             _add_chunks(results)
             pass_count += 1
@@ -377,177 +672,201 @@ async def _run_investigation_inner(
         errors_log.append(f"Semantic Search: {len(errors)} pass(es) failed — {'; '.join(errors)}")
 
     if errors and not all_context_chunks:
-        yield _sse("step_status", {
-            "step": "semantic_search", "label": "Research", "status": "error",
-            "detail": f"All passes failed: {'; '.join(errors)}",
-        })
+        yield _step_status("semantic_search", "Research", "error", f"All passes failed: {'; '.join(errors)}")
     else:
         done_detail = f"{pass_count} passes, {len(all_context_chunks)} unique chunks"
         if errors:
             done_detail += f" ({len(errors)} errors)"
-        yield _sse("step_status", {
-            "step": "semantic_search", "label": "Research", "status": "done",
-            "detail": done_detail,
-        })
-    await asyncio.sleep(0.3)
+        yield _step_status("semantic_search", "Research", "done", done_detail)
 
     # ---------------------------------------------------------------
     # Phase E: Keyword Search
     # ---------------------------------------------------------------
-    yield _sse("step_status", {"step": "keyword_search", "label": "Keyword Search", "status": "running"})
-    await asyncio.sleep(0.1)
+    yield _step_status("keyword_search", "Keyword Search", "running")
+    await asyncio.sleep(0)
 
     keyword_results = []
     keyword_failed = False
-    try:
-        search_names = []
-        if primary_entity:
-            search_names.append(primary_entity)
-        search_names.extend(secondary_entities[:2])
-        search_names.extend(discovered_entities[:2])
-        search_names = [n for n in search_names if n and len(n) > 2]
-
-        for name in search_names[:3]:
-            try:
-                pc_filter = {"people": {"$in": [name]}}
-                kw_results, _ = await asyncio.to_thread(
-                    _safe_semantic_pass,
-                    semantic_search_fn, name, genai_client, pinecone_index,
-                    rerank_fn=None, fetch_k=10, rerank_top_n=5, pinecone_filter=pc_filter,
-                )
-                _add_chunks(kw_results)
-            except Exception:
-                pass
-
-        try:
-            from api.graph_ops import keyword_search_evidence
-        except ImportError:
-            from graph_ops import keyword_search_evidence
 
-        if supabase_client and search_names:
-            keyword_results = await asyncio.to_thread(
-                keyword_search_evidence, supabase_client, search_names[:5], limit=10
-            )
+    search_names = []
+    if primary_entity:
+        search_names.append(primary_entity)
+    search_names.extend(secondary_entities[:2])
+    search_names.extend(discovered_entities[:2])
+    search_names = [n for n in search_names if n and len(n) > 2]
+
+    # The Pinecone name lookup and the Supabase evidence search are independent
+    tasks = []
+    if search_names:
+        tasks.append(_schedule_searches([_names_query(list(dict.fromkeys(search_names[:3])))], reranked=False)[0])
+    run_evidence_search = bool(supabase_client and search_names)
+    if run_evidence_search:
+        tasks.append(_to_exec(keyword_search_evidence, supabase_client, search_names[:5], limit=10))
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    if run_evidence_search:
+        evidence_res = results.pop()
+        if isinstance(evidence_res, Exception):
+            print(f"DEBUG: Keyword search failed: {evidence_res}")
+            errors_log.append(f"Keyword Search: {type(evidence_res).__name__} — keyword matches unavailable")
+            keyword_failed = True
+            keyword_error = f"{type(evidence_res).__name__}: {evidence_res}"
+        else:
+            keyword_results = evidence_res
 
-    except Exception as e:
-        print(f"DEBUG: Keyword search failed: {e}")
-        errors_log.append(f"Keyword Search: {type(e).__name__} — keyword matches unavailable")
-        keyword_failed = True
-        keyword_error = f"{type(e).__name__}: {e}"
+    if results and not isinstance(results[0], Exception):
+        kw_results, _ = results[0]
+        _add_chunks(kw_results)
 
     if keyword_failed:
-        yield _sse("step_status", {
-            "step": "keyword_search", "label": "Keyword Search", "status": "error",
-            "detail": keyword_error,
-        })
+        yield _step_status("keyword_search", "Keyword Search", "error", keyword_error)
     else:
-        yield _sse("step_status", {
-            "step": "keyword_search", "label": "Keyword Search", "status": "done",
-            "detail": f"{len(all_context_chunks)} total chunks, {len(keyword_results)} graph matches",
-        })
-    await asyncio.sleep(0.3)
+        yield _step_status(
+            "keyword_search", "Keyword Search", "done",
+            f"{len(all_context_chunks)} total chunks, {len(keyword_results)} graph matches",
+        )
 
     # ---------------------------------------------------------------
     # Phase F: Synthesis
     # ---------------------------------------------------------------
-    yield _sse("step_status", {"step": "synthesis", "label": "Writing Report", "status": "running"})
-    await asyncio.sleep(0.1)
+    yield _step_status("synthesis", "Writing Report", "running")
+    await asyncio.sleep(0)
 
-    context_parts = []
+    # Every section is appended straight into one buffer and joined once
+    buf: list[str] = []
+    bufapp = buf.append
+    context_chars = 0
+    n_chunks = 0
+    # (filename, page) -> source, first seen wins; emitted after the report streams
+    source_map: dict[tuple, dict] = {}
 
     for c in all_context_chunks:
-        context_parts.append(f"[Source: {c['filename']}, Page: {c['page']}]\n{_truncate_at_sentence(c['text'])}")
-        all_sources.append({"filename": c["filename"], "page": c["page"], "score": round(c.get("score", 0) or 0, 3)})
+        part = f"[Source: {c['filename']}, Page: {c['page']}]\n{_truncate_at_sentence(c['text'])}"
+        if buf and context_chars + len(part) > _CONTEXT_CHAR_BUDGET:
+            print(f"DEBUG: Context budget reached, dropping {len(all_context_chunks) - n_chunks} chunks")
+            break
+        if buf:
+            bufapp(_CONTEXT_SEP)
+        bufapp(part)
+        n_chunks += 1
+        context_chars += len(part) + len(_CONTEXT_SEP)
+        key = (c["filename"], c["page"])
+        if key not in source_map and len(source_map) < _MAX_SOURCES:
+            source_map[key] = {"filename": c["filename"], "page": c["page"], "score": round(c.get("score", 0) or 0, 3)}
 
     if graph_evidence:
-        graph_ctx = "\n\nKNOWLEDGE GRAPH EVIDENCE:\n"
+        if buf:
+            bufapp(_CONTEXT_SEP)
+        bufapp("\n\nKNOWLEDGE GRAPH EVIDENCE:\n")
         for e in graph_evidence[:30]:
             ev_text = e.get("evidence_text", "")
             if ev_text:
                 src_file = e.get("source_filename", "graph")
-                graph_ctx += f"[Source: {src_file}, Relationship: {e.get('predicate', 'related')}]\n"
-                graph_ctx += f"{e['source']} --[{e.get('predicate', 'related')}]--> {e['target']}: {ev_text}\n\n"
-        context_parts.append(graph_ctx)
+                predicate = e.get("predicate", "related")
+                bufapp(
+                    f"[Source: {src_file}, Relationship: {predicate}]\n"
+                    f"{e['source']} --[{predicate}]--> {e['target']}: {ev_text}\n\n"
+                )
 
     if entity_intel.get("found"):
-        intel_ctx = f"\n\nENTITY PROFILE: {entity_intel['entity_name']}\n"
-        intel_ctx += f"Type: {entity_intel['entity_type']}\n"
-        intel_ctx += f"Description: {entity_intel.get('description', 'N/A')}\n"
-        intel_ctx += f"Aliases: {', '.join(entity_intel.get('aliases', []))}\n"
-        intel_ctx += f"Total connections: {entity_intel['edge_count']}\n"
-        intel_ctx += f"Connected entities: {', '.join(discovered_entities[:15])}\n"
-        intel_ctx += f"Relationship types: {', '.join(discovered_relationships[:10])}\n"
-        context_parts.append(intel_ctx)
+        if buf:
+            bufapp(_CONTEXT_SEP)
+        bufapp(
+            f"\n\nENTITY PROFILE: {entity_intel['entity_name']}\n"
+            f"Type: {entity_intel['entity_type']}\n"
+            f"Description: {entity_intel.get('description', 'N/A')}\n"
+            f"Aliases: {', '.join(entity_intel.get('aliases', []))}\n"
+            f"Total connections: {entity_intel['edge_count']}\n"
+            f"Connected entities: {', '.join(islice(discovered_entities, 15))}\n"
+            f"Relationship types: {', '.join(islice(discovered_relationships, 10))}\n"
+        )
 
     if keyword_results:
-        kw_ctx = "\n\nKEYWORD MATCHES IN EVIDENCE:\n"
+        if buf:
+            bufapp(_CONTEXT_SEP)
+        bufapp("\n\nKEYWORD MATCHES IN EVIDENCE:\n")
         for e in keyword_results[:10]:
-            kw_ctx += f"- {e.get('source', '?')} --[{e.get('predicate', '?')}]--> {e.get('target', '?')}: {e.get('evidence_text', '')[:300]}\n"
-        context_parts.append(kw_ctx)
-
-    full_context = "\n\n---\n\n".join(context_parts)
+            bufapp(f"- {e.get('source', '?')} --[{e.get('predicate', '?')}]--> {e.get('target', '?')}: {e.get('evidence_text', '')[:300]}\n")
 
     if errors_log:
-        gaps = "\n\nDATA GAPS (some pipeline phases failed — caveat findings accordingly):\n"
-        for err_msg in errors_log:
-            gaps += f"- {err_msg}\n"
-        full_context += gaps
+        bufapp("\n\nDATA GAPS (some pipeline phases failed — caveat findings accordingly):\n")
+        buf.extend(f"- {err_msg}\n" for err_msg in errors_log)
+
+    full_context = "".join(buf)
 
     if not full_context.strip():
-        yield _sse("text", {"text": "No relevant information was found in the database for this query. Try uploading documents first, or rephrase your query with more specific terms."})
-        yield _sse("step_status", {"step": "synthesis", "label": "Writing Report", "status": "done", "detail": "No context available"})
+        yield _sse_text("No relevant information was found in the database for this query. Try uploading documents first, or rephrase your query with more specific terms.")
+        yield _step_status("synthesis", "Writing Report", "done", "No context available")
         yield _sse("done", {})
         return
 
     # Build mode-specific synthesis prompt
-    report_sections = (
-        "Write a thorough investigative report with these sections:\n"
-        "## Executive Summary\nBrief overview of key findings.\n\n"
-        "## Key Connections\nImportant relationships and links discovered.\n\n"
-        "## Document Evidence\nSpecific evidence from source documents with citations [Source: filename].\n\n"
-        "## Timeline\nChronological events if dates are available.\n\n"
-        "## Assessment\nAnalytical assessment of the findings.\n\n"
-        "Cite sources using [Source: filename] tags. Be thorough but precise."
-    )
+    synthesis_prompt = SYNTHESIS_PROMPT_TEMPLATE.format_map({
+        "context": full_context,
+        "query": query,
+        "source_rules": _WEB_SOURCE_RULES if mode == "files_web" else _FILES_ONLY_SOURCE_RULES,
+    })
 
+    # Web search step (files_web mode only)
     if mode == "files_web":
-        synthesis_prompt = (
-            "You are an elite investigative intelligence analyst writing a comprehensive investigative report.\n\n"
-            "CONTEXT (documents, graph intelligence, entity profiles):\n"
-            f"{full_context}\n\n"
-            f"INVESTIGATION QUERY: {query}\n\n"
-            f"{report_sections}\n\n"
-            "Prioritize evidence from the provided document context above. "
-            "If the documents are insufficient to fully answer the query, supplement with Google Search. "
-            "Prefix any web-sourced information with [Web]. "
-            "Always clearly distinguish document evidence from web-sourced information."
-        )
-    else:
-        synthesis_prompt = (
-            "You are an elite investigative intelligence analyst writing a comprehensive investigative report.\n\n"
-            "CONTEXT (documents, graph intelligence, entity profiles):\n"
-            f"{full_context}\n\n"
-            f"INVESTIGATION QUERY: {query}\n\n"
-            f"{report_sections}\n\n"
-            "ONLY use information from the provided context. "
-            "Do not fabricate information not supported by the provided context. "
-            "If the provided context is insufficient to fully answer the query, explicitly state what information is missing rather than speculating."
+        yield _step_status("web_search", "Web Search", "running", "Gemini will search if needed")
+        await asyncio.sleep(0)
+
+    def _followup_prompt() -> str:
+        synthesis_summary = "".join(synthesis_text_parts)[:500] if synthesis_text_parts else ""
+        prompt = FOLLOWUP_PROMPT_TEMPLATE.format(
+            query=query,
+            entities=f"{primary_entity}, {', '.join(islice(discovered_entities, 5))}",
+            relationships=', '.join(islice(discovered_relationships, 5)),
         )
+        if synthesis_summary:
+            prompt += f"\n\nKey findings so far:\n{synthesis_summary}"
+        return prompt
 
-    # Web search step (files_web mode only)
-    if mode == "files_web":
-        yield _sse("step_status", {"step": "web_search", "label": "Web Search", "status": "running", "detail": "Gemini will search if needed"})
-        await asyncio.sleep(0.1)
+    async def _pump_synthesis(stream, queue: asyncio.Queue):
+        """Producer: pull report text from Gemini into the queue, ending with _STREAM_END."""
+        nonlocal synthesis_len, followup_task
+        try:
+            async for chunk in stream:
+                if chunk.text:
+                    synthesis_text_parts.append(chunk.text)
+                    synthesis_len += len(chunk.text)
+                    # The follow-up prompt only uses the first 500 chars of the report,
+                    # so start that call now and let it overlap the rest of the stream
+                    if need_followup_call and followup_task is None and synthesis_len >= 500:
+                        followup_task = asyncio.create_task(_cached_generate_json(genai_client, _followup_prompt(), model=FOLLOWUP_MODEL, expect=list))
+                    await queue.put(chunk.text)
+                # Collect grounding metadata from the final chunk
+                if hasattr(chunk, 'candidates') and chunk.candidates:
+                    candidate = chunk.candidates[0]
+                    gm = getattr(candidate, 'grounding_metadata', None)
+                    grounding_chunks = getattr(gm, 'grounding_chunks', None) if gm else None
+                    # Extract web sources from grounding chunks
+                    for gc in grounding_chunks or []:
+                        web = getattr(gc, 'web', None)
+                        if web:
+                            uri = getattr(web, 'uri', '') or ''
+                            title = getattr(web, 'title', '') or ''
+                            # Keyed by URI so repeats across chunks are dropped here
+                            if uri and uri not in web_sources:
+                                domain = urllib.parse.urlparse(uri).netloc.removeprefix('www.')
+                                web_sources[uri] = {"title": title, "uri": uri, "domain": domain}
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_STREAM_END)
 
     synthesis_failed = False
     synthesis_text_parts = []
-    web_sources = []
+    synthesis_len = 0
+    text_buf = []  # stream chunks not yet sent to the client
+    text_buf_len = 0
+    # Phase A usually proposes follow-ups already; only ask again when it didn't
+    need_followup_call = include_followups and len(candidate_followups) < 3
+    followup_task = None
+    web_sources: dict[str, dict] = {}  # uri -> source, first seen wins
     try:
-        # Run the entire streaming call + iteration in a single background thread,
-        # collecting chunks into a thread-safe queue so we can yield SSE events
-        # from the async generator without blocking the event loop.
-        chunk_queue = _queue.Queue()
-
         # Build config with optional Google Search tool
         synthesis_config = None
         if mode == "files_web":
@@ -555,117 +874,92 @@ async def _run_investigation_inner(
                 tools=[types.Tool(google_search=types.GoogleSearch())]
             )
 
-        def _produce_chunks():
-            try:
-                kwargs = dict(
-                    model="gemini-2.0-flash",
-                    contents=synthesis_prompt,
-                )
-                if synthesis_config:
-                    kwargs["config"] = synthesis_config
-                stream = genai_client.models.generate_content_stream(**kwargs)
-                for chunk in stream:
-                    if chunk.text:
-                        chunk_queue.put(("text", chunk.text))
-                    # Collect grounding metadata from the final chunk
-                    if hasattr(chunk, 'candidates') and chunk.candidates:
-                        candidate = chunk.candidates[0]
-                        gm = getattr(candidate, 'grounding_metadata', None)
-                        if gm:
-                            grounding_chunks = getattr(gm, 'grounding_chunks', None)
-                            if grounding_chunks:
-                                chunk_queue.put(("grounding", grounding_chunks))
-            except Exception as exc:
-                chunk_queue.put(("error", exc))
-            finally:
-                chunk_queue.put(None)  # sentinel
-
-        # Start producer in a background thread
-        loop = asyncio.get_event_loop()
-        producer = loop.run_in_executor(None, _produce_chunks)
-
-        # Consume chunks as they arrive
-        while True:
-            item = await asyncio.to_thread(chunk_queue.get)
-            if item is None:
-                break
-            if item[0] == "error":
-                raise item[1]
-            elif item[0] == "grounding":
-                # Extract web sources from grounding chunks
-                for gc in item[1]:
-                    web = getattr(gc, 'web', None)
-                    if web:
-                        uri = getattr(web, 'uri', '') or ''
-                        title = getattr(web, 'title', '') or ''
-                        if uri:
-                            domain = urllib.parse.urlparse(uri).netloc.removeprefix('www.')
-                            web_sources.append({"title": title, "uri": uri, "domain": domain})
-            elif item[0] == "text":
-                synthesis_text_parts.append(item[1])
-                yield _sse("text", {"text": item[1]})
-            await asyncio.sleep(0.01)
-
-        await producer  # ensure thread completed
+        kwargs = dict(
+            model=synthesis_model,
+            contents=synthesis_prompt,
+        )
+        if synthesis_config:
+            kwargs["config"] = synthesis_config
+
+        # A producer task reads the stream ahead of the SSE consumer into a
+        # bounded queue, so a slow client doesn't stall the Gemini connection;
+        # maxsize caps how much text is buffered per request.
+        stream = await genai_client.aio.models.generate_content_stream(**kwargs)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_SYNTHESIS_QUEUE_MAX)
+        pump = asyncio.create_task(_pump_synthesis(stream, queue))
+        try:
+            last_flush = time.monotonic()
+            while True:
+                if text_buf:
+                    # Buffered text goes out on the timer even if the model stalls
+                    remaining = _TEXT_FLUSH_SECS - (time.monotonic() - last_flush)
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout=max(remaining, 0))
+                    except asyncio.TimeoutError:
+                        yield _sse_text("".join(text_buf))
+                        text_buf.clear()
+                        text_buf_len = 0
+                        last_flush = time.monotonic()
+                        continue
+                else:
+                    item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                text_buf.append(item)
+                text_buf_len += len(item)
+                now = time.monotonic()
+                if text_buf_len >= _TEXT_FLUSH_CHARS or now - last_flush >= _TEXT_FLUSH_SECS:
+                    yield _sse_text("".join(text_buf))
+                    text_buf.clear()
+                    text_buf_len = 0
+                    last_flush = now
+        finally:
+            # Client went away or the stream failed: don't leave the producer blocked on put()
+            pump.cancel()
+        if text_buf:
+            yield _sse_text("".join(text_buf))
+            text_buf.clear()
     except Exception as e:
         synthesis_failed = True
-        yield _sse("text", {"text": f"\n\n**Report generation error:** {type(e).__name__}: {e}"})
+        if text_buf:
+            yield _sse_text("".join(text_buf))
+        yield _sse_text(f"\n\n**Report generation error:** {type(e).__name__}: {e}")
+
+    if need_followup_call and followup_task is None:
+        followup_task = asyncio.create_task(_cached_generate_json(genai_client, _followup_prompt(), model=FOLLOWUP_MODEL, expect=list))
 
     if synthesis_failed:
-        yield _sse("step_status", {"step": "synthesis", "label": "Writing Report", "status": "error", "detail": "Generation failed"})
+        yield _step_status("synthesis", "Writing Report", "error", "Generation failed")
     else:
-        yield _sse("step_status", {"step": "synthesis", "label": "Writing Report", "status": "done"})
+        yield _step_status("synthesis", "Writing Report", "done")
 
     # Emit web search step status and web sources
     if mode == "files_web":
-        # Deduplicate web sources by URI
-        seen_uris = set()
-        unique_web_sources = []
-        for ws in web_sources:
-            if ws["uri"] not in seen_uris:
-                seen_uris.add(ws["uri"])
-                unique_web_sources.append(ws)
+        unique_web_sources = list(web_sources.values())
         if unique_web_sources:
-            yield _sse("step_status", {"step": "web_search", "label": "Web Search", "status": "done", "detail": f"{len(unique_web_sources)} web sources"})
+            yield _step_status("web_search", "Web Search", "done", f"{len(unique_web_sources)} web sources")
             yield _sse("web_sources", {"web_sources": unique_web_sources})
         else:
-            yield _sse("step_status", {"step": "web_search", "label": "Web Search", "status": "done", "detail": "No web sources needed"})
-
-    # Deduplicate sources
-    seen_source_files = set()
-    unique_sources = []
-    for s in all_sources:
-        key = f"{s['filename']}:{s['page']}"
-        if key not in seen_source_files:
-            seen_source_files.add(key)
-            unique_sources.append(s)
+            yield _step_status("web_search", "Web Search", "done", "No web sources needed")
 
-    yield _sse("sources", {"sources": unique_sources[:20]})
+    yield _sse("sources", {"sources": list(source_map.values())})
 
-    # Generate follow-up questions
-    try:
-        synthesis_summary = "".join(synthesis_text_parts)[:500] if synthesis_text_parts else ""
-        followup_prompt = (
-            f"Based on this investigation about '{query}', suggest 3-4 specific follow-up questions "
-            f"that would deepen the investigation. Focus on unexplored connections, missing evidence, "
-            f"or related entities. Return JSON array of strings.\n\n"
-            f"Key entities found: {primary_entity}, {', '.join(discovered_entities[:5])}\n"
-            f"Relationships: {', '.join(discovered_relationships[:5])}"
-        )
-        if synthesis_summary:
-            followup_prompt += f"\n\nKey findings so far:\n{synthesis_summary}"
-        followup_res = await asyncio.to_thread(
-            genai_client.models.generate_content,
-            model="gemini-2.0-flash",
-            contents=followup_prompt,
-            config=types.GenerateContentConfig(response_mime_type="application/json"),
-        )
-        followup_text = _extract_json(followup_res.text)
-        follow_ups = json.loads(followup_text)
-        if isinstance(follow_ups, list):
-            yield _sse("follow_ups", {"follow_ups": follow_ups[:4]})
-    except Exception as e:
-        print(f"DEBUG: Follow-up generation failed: {e}")
+    # Follow-up questions: the request started during synthesis, or Phase A's candidates
+    # (followup_task is never started when include_followups is off)
+    if followup_task is None:
+        if include_followups:
+            yield _sse("follow_ups", {"follow_ups": candidate_followups[:4]})
+    else:
+        try:
+            follow_ups = await asyncio.wait_for(followup_task, timeout=_FOLLOWUP_WAIT_SECS)
+            if isinstance(follow_ups, list):
+                yield _sse("follow_ups", {"follow_ups": follow_ups[:4]})
+        except asyncio.TimeoutError:
+            print(f"DEBUG: Follow-up generation exceeded {_FOLLOWUP_WAIT_SECS}s, skipping")
+        except Exception as e:
+            print(f"DEBUG: Follow-up generation failed: {e}")
 
     yield _sse("done", {})
 
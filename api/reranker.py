@@ -6,6 +6,11 @@ Model stored in /tmp/flashrank (Vercel-writable directory).
 
 import os
 
+# FlashRank ships this model as a dynamically INT8-quantized ONNX export
+# (flashrank-MiniLM-L-12-v2_Q.onnx); set RERANK_MODEL=ms-marco-TinyBERT-L-2-v2
+# to trade some accuracy for a much faster, smaller cross-encoder
+RERANK_MODEL = os.getenv("RERANK_MODEL", "ms-marco-MiniLM-L-12-v2").strip()
+
 _ranker = None
 
 
@@ -18,10 +23,10 @@ def _get_ranker():
         cache_dir = os.path.join("/tmp", "flashrank")
         os.makedirs(cache_dir, exist_ok=True)
         _ranker = Ranker(
-            model_name="ms-marco-MiniLM-L-12-v2",
+            model_name=RERANK_MODEL,
             cache_dir=cache_dir,
         )
-        print("DEBUG: FlashRank reranker loaded successfully")
+        print(f"DEBUG: FlashRank reranker loaded successfully ({RERANK_MODEL})")
         return _ranker
     except Exception as e:
         print(f"DEBUG: Failed to load FlashRank reranker: {e}")
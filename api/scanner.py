@@ -6,6 +6,11 @@ Returns structured findings for case proposals.
 """
 
 import json
+import hashlib
+import heapq
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from google.genai import types
 
 
@@ -94,14 +99,12 @@ def _build_entity_map(supabase_client):
         if not edges:
             return ""
 
-        # Compute degree for each entity
-        degree = {}
-        for e in edges:
-            degree[e["source"]] = degree.get(e["source"], 0) + 1
-            degree[e["target"]] = degree.get(e["target"], 0) + 1
+        # Compute degree for each entity (Counter counts the ID stream in C)
+        degree = Counter(map(itemgetter("source"), edges))
+        degree.update(map(itemgetter("target"), edges))
 
-        # Get top 20 by degree
-        top_ids = sorted(degree, key=degree.get, reverse=True)[:20]
+        # Get top 20 by degree (bounded heap instead of sorting every entity)
+        top_ids = heapq.nlargest(20, degree, key=degree.get)
 
         # Fetch those nodes
         nodes_res = supabase_client.table("nodes").select("id,label,type,description,aliases").in_("id", top_ids).execute()
@@ -122,18 +125,26 @@ def _build_entity_map(supabase_client):
             if aliases:
                 parts.append(f"    Aliases: {aliases}")
 
-        # Include edges between top entities
+        # Include edges between top entities: one pass counts them all but only
+        # the first 60 are kept and rendered
         top_set = set(top_ids)
-        relevant_edges = [e for e in edges if e["source"] in top_set or e["target"] in top_set]
-
-        parts.append(f"\nRELATIONSHIPS ({len(relevant_edges)} involving key entities):")
-        for e in relevant_edges[:60]:
-            src_label = nodes.get(e["source"], {}).get("label", e["source"])
-            tgt_label = nodes.get(e["target"], {}).get("label", e["target"])
+        labels = {nid: n.get("label", nid) for nid, n in nodes.items()}
+        relevant_count = 0
+        rel_lines = []
+        for e in edges:
+            src, tgt = e["source"], e["target"]
+            if src not in top_set and tgt not in top_set:
+                continue
+            relevant_count += 1
+            if relevant_count > 60:
+                continue
+            rel_lines.append(f"  {labels.get(src, src)} --[{e['predicate']}]--> {labels.get(tgt, tgt)}")
             evidence = (e.get("evidence_text") or "")[:200]
-            parts.append(f"  {src_label} --[{e['predicate']}]--> {tgt_label}")
             if evidence:
-                parts.append(f"    Evidence: {evidence}")
+                rel_lines.append(f"    Evidence: {evidence}")
+
+        parts.append(f"\nRELATIONSHIPS ({relevant_count} involving key entities):")
+        parts.extend(rel_lines)
 
         return "\n".join(parts)
     except Exception as e:
@@ -141,20 +152,24 @@ def _build_entity_map(supabase_client):
         return ""
 
 
+_SAMPLE_TOPICS = (
+    "financial transactions wire transfers payments",
+    "shell companies offshore accounts corporate structure",
+    "travel records flights meetings",
+    "legal proceedings allegations criminal",
+    "contracts agreements beneficial ownership",
+)
+
+# One long-lived pool for the topic searches, rather than spinning up (and
+# joining) fresh threads on every scan
+_TOPIC_POOL = ThreadPoolExecutor(max_workers=len(_SAMPLE_TOPICS), thread_name_prefix="scanner-topic")
+
+
 def _sample_documents(genai_client, pinecone_index, semantic_search_fn):
     """Sample high-relevance document chunks across investigative topics."""
-    topics = [
-        "financial transactions wire transfers payments",
-        "shell companies offshore accounts corporate structure",
-        "travel records flights meetings",
-        "legal proceedings allegations criminal",
-        "contracts agreements beneficial ownership",
-    ]
-
-    all_chunks = {}
-    for topic in topics:
+    def _search_topic(topic):
         try:
-            results = semantic_search_fn(
+            return semantic_search_fn(
                 query_text=topic,
                 genai_client=genai_client,
                 pinecone_index=pinecone_index,
@@ -162,13 +177,23 @@ def _sample_documents(genai_client, pinecone_index, semantic_search_fn):
                 fetch_k=30,
                 rerank_top_n=4,
             )
-            if results:
-                for c in results:
-                    sig = c.get("text", "")[:200]
-                    if sig and sig not in all_chunks:
-                        all_chunks[sig] = c
         except Exception as e:
             print(f"DEBUG: Document sample for '{topic}' failed: {e}")
+            return []
+
+    # Topic searches are independent network round-trips; map keeps topic order
+    topic_results = list(_TOPIC_POOL.map(_search_topic, _SAMPLE_TOPICS))
+
+    all_chunks = {}
+    for results in topic_results:
+        for c in results or []:
+            text = c.get("text", "")
+            if not text:
+                continue
+            # Digest of the full text: chunks sharing a page header aren't merged
+            sig = hashlib.blake2b(text.encode(), digest_size=8).digest()
+            if sig not in all_chunks:
+                all_chunks[sig] = c
 
     if not all_chunks:
         return ""
@@ -32,6 +32,7 @@ ENV_FILE = PROJECT_DIR / ".env.prod"
 
 PINECONE_QUERY_DELAY = 0.5  # seconds between Pinecone queries (free-tier safe)
 EMBED_DELAY = 1.0           # seconds between embedding calls
+EMBED_BATCH_SIZE = 100      # probe texts per embed_content call
 VECTOR_DIM = 3072           # gemini-embedding-001 dimension
 
 SEMANTIC_PROBES = [
@@ -99,16 +100,18 @@ def make_random_unit_vectors(n, dim=VECTOR_DIM):
 
 
 def embed_probes(genai_client, probes):
-    """Embed semantic probe strings via gemini-embedding-001."""
+    """Embed semantic probe strings via gemini-embedding-001, EMBED_BATCH_SIZE per call."""
     vectors = []
-    for probe in probes:
+    for start in range(0, len(probes), EMBED_BATCH_SIZE):
+        batch = probes[start:start + EMBED_BATCH_SIZE]
         time.sleep(EMBED_DELAY)
         res = genai_client.models.embed_content(
             model="gemini-embedding-001",
-            contents=[probe],
+            contents=batch,
         )
-        vectors.append(res.embeddings[0].values)
-        print(f"  Embedded: \"{probe}\"")
+        for probe, emb in zip(batch, res.embeddings):
+            vectors.append(emb.values)
+            print(f"  Embedded: \"{probe}\"")
     return vectors
 
 
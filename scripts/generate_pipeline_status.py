@@ -38,6 +38,16 @@ DATASET_INFO = {
     "12": {"name": "Late Production", "description": "~150 late-production supplemental documents"},
 }
 
+# Dataset numbers in display order, computed once instead of re-sorting per call
+DATASET_ORDER = tuple(sorted(DATASET_INFO, key=int))
+
+# (dataset number, filename patterns), highest number first so "dataset12" is
+# tried before "dataset1". Built once at import; classify_dataset runs per blob.
+_DATASET_PATTERNS = tuple(
+    (str(i), (f"dataset{i}", f"data-set-{i}", f"dataset-{i}", f"data_set_{i}", f"dataset {i}", f"dataset%20{i}"))
+    for i in range(12, 0, -1)
+)
+
 
 def load_env():
     env = {}
@@ -53,13 +63,15 @@ def load_env():
 def classify_dataset(filename):
     """Classify which dataset a file belongs to based on its name."""
     fname = filename.lower()
-    for i in [12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]:
-        for pattern in [f"dataset{i}", f"data-set-{i}", f"dataset-{i}", f"data_set_{i}", f"dataset {i}", f"dataset%20{i}"]:
+    if "data" not in fname:
+        return "unknown"
+    for ds_num, patterns in _DATASET_PATTERNS:
+        for pattern in patterns:
             idx = fname.find(pattern)
             if idx >= 0:
                 end_pos = idx + len(pattern)
                 if end_pos >= len(fname) or not fname[end_pos].isdigit():
-                    return str(i)
+                    return ds_num
     return "unknown"
 
 
@@ -130,7 +142,7 @@ def generate_status(bucket=None):
 
     # --- Assemble per-dataset stats ---
     datasets = {}
-    for ds_num in sorted(DATASET_INFO.keys(), key=lambda x: int(x)):
+    for ds_num in DATASET_ORDER:
         info = DATASET_INFO[ds_num]
         discovered = len(urls_discovered.get(ds_num, []))
 
@@ -22,11 +22,19 @@ Usage:
 """
 
 import os
+import re
 import sys
 import json
 import time
+import sqlite3
+import hashlib
+from array import array
 import tempfile
 import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from tqdm import tqdm
 
@@ -37,11 +45,17 @@ SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent
 ENV_FILE = PROJECT_DIR / ".env.prod"
 PROGRESS_FILE = SCRIPT_DIR / "reindex_progress.json"
+CACHE_FILE = SCRIPT_DIR / "reindex_cache.sqlite"  # content-hash cache of OCR text + embeddings
+EMBED_MODEL = "gemini-embedding-001"
 
 CHUNK_SIZE = 1500       # chars per chunk (with overlap)
 CHUNK_OVERLAP = 200     # overlap between chunks for context continuity
 EMBED_BATCH_DELAY = 1.0 # seconds between embedding calls (rate limit)
-VISION_DELAY = 3.0      # seconds between Gemini vision calls (rate limit)
+VISION_DELAY = 3.0      # seconds between Gemini vision calls (rate limit, per worker)
+VISION_WORKERS = 4      # concurrent Gemini vision calls for sectioned PDFs
+DOWNLOAD_PREFETCH = 4   # PDFs downloaded (and text-extracted) ahead of the one being processed
+EXTRACT_WORKERS = min(DOWNLOAD_PREFETCH, os.cpu_count() or 1)  # processes for pypdf extraction
+EMBED_WORKERS = 4       # concurrent embed_content calls (each still paced by EMBED_BATCH_DELAY)
 MAX_PDF_SIZE_MB = 20    # max PDF size for single Gemini vision call
 MAX_RETRIES = 3
 GEMINI_TIMEOUT_MS = 120_000  # 2-minute timeout per Gemini request
@@ -68,6 +82,120 @@ def save_progress(progress):
     PROGRESS_FILE.write_text(json.dumps(progress, indent=2))
 
 
+_WORD_RE = re.compile(r"\S+")
+
+
+def is_readable_page(text, min_words=10):
+    """Page quality check: at least min_words alphabetic words of 3+ letters.
+
+    Stops at the min_words-th match instead of splitting the whole page.
+    """
+    count = 0
+    for m in _WORD_RE.finditer(text):
+        word = m.group()
+        if len(word) > 2 and word.isalpha():
+            count += 1
+            if count >= min_words:
+                return True
+    return False
+
+
+def extract_standard_text(pdf_bytes, known_scanned=False):
+    """Run pypdf text extraction on a PDF; executed in the extraction process pool.
+
+    Returns (page_count, page_texts, good_pages) where page_texts is a list of
+    (page_number, text). Stops early once half the pages can no longer be
+    readable, since those PDFs go to Gemini vision anyway. With known_scanned
+    (cached OCR exists for these bytes) only the page count is read and
+    page_texts is None.
+    """
+    from pypdf import PdfReader
+    import io
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    page_count = len(reader.pages)
+    if known_scanned:
+        return page_count, None, 0
+    page_texts = []
+    good_pages = 0
+    for page_idx, page in enumerate(reader.pages):
+        page_text = (page.extract_text() or "").strip()
+        if is_readable_page(page_text):
+            good_pages += 1
+        page_texts.append((page_idx + 1, page_text))
+        # Scanned PDF: the 50% bar is already out of reach, so stop extracting
+        if good_pages + (page_count - page_idx - 1) < page_count * 0.5:
+            break
+    return page_count, page_texts, good_pages
+
+
+def open_cache():
+    """Open (creating if needed) the sqlite cache keyed by SHA-256 of content.
+
+    Re-running over overlapping files skips Gemini vision OCR when the PDF
+    bytes were seen before, and skips embedding calls for identical chunk text.
+    """
+    conn = sqlite3.connect(CACHE_FILE)
+    # Every OCR/embedding store commits; WAL + synchronous=NORMAL avoids an fsync
+    # per commit. A crash can lose the last few entries, which just get recomputed.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS ocr (pdf_sha256 TEXT PRIMARY KEY, page_texts TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key_sha256 TEXT PRIMARY KEY, vector BLOB)")
+    return conn
+
+
+def _embed_key(text):
+    return hashlib.sha256(f"{EMBED_MODEL}\0{text}".encode()).hexdigest()
+
+
+def cached_embeddings(cache, texts):
+    """Return {index: vector} for the texts whose embeddings are already cached."""
+    if cache is None:
+        return {}
+    found = {}
+    for i, text in enumerate(texts):
+        row = cache.execute("SELECT vector FROM embeddings WHERE key_sha256 = ?", (_embed_key(text),)).fetchone()
+        if row:
+            found[i] = array("d", row[0]).tolist()
+    return found
+
+
+def store_embeddings(cache, texts, vectors):
+    if cache is None:
+        return
+    cache.executemany(
+        "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+        [(_embed_key(t), array("d", v).tobytes()) for t, v in zip(texts, vectors)],
+    )
+    cache.commit()
+
+
+def cached_ocr(cache, pdf_sha256):
+    if cache is None:
+        return None
+    row = cache.execute("SELECT page_texts FROM ocr WHERE pdf_sha256 = ?", (pdf_sha256,)).fetchone()
+    return [tuple(p) for p in json.loads(row[0])] if row else None
+
+
+def has_cached_ocr(pdf_sha256):
+    """Whether OCR text is cached for these PDF bytes, i.e. they already failed the
+    standard-extraction check once. Uses its own short-lived connection so the
+    prefetch threads can call it (WAL lets it read alongside the main writer)."""
+    conn = sqlite3.connect(CACHE_FILE)
+    try:
+        return conn.execute("SELECT 1 FROM ocr WHERE pdf_sha256 = ?", (pdf_sha256,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def store_ocr(cache, pdf_sha256, page_texts):
+    if cache is None or not page_texts:
+        return
+    cache.execute("INSERT OR REPLACE INTO ocr VALUES (?, ?)", (pdf_sha256, json.dumps(page_texts)))
+    cache.commit()
+
+
 def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
     """Split text into overlapping chunks (legacy, no page tracking)."""
     chunks = []
@@ -135,9 +263,10 @@ def extract_text_with_gemini(client, types, pdf_bytes, filename, page_count):
         import io
 
         reader = PdfReader(io.BytesIO(pdf_bytes))
-        page_texts = []
         pages_per_batch = 5 if size_mb > MAX_PDF_SIZE_MB else 10
 
+        # Split into section PDFs up front (pypdf readers aren't shared across threads)
+        sections = []
         for batch_start in range(0, len(reader.pages), pages_per_batch):
             batch_end = min(batch_start + pages_per_batch, len(reader.pages))
             writer = PdfWriter()
@@ -146,8 +275,10 @@ def extract_text_with_gemini(client, types, pdf_bytes, filename, page_count):
 
             buf = io.BytesIO()
             writer.write(buf)
-            section_bytes = buf.getvalue()
+            sections.append((batch_start, batch_end, buf.getvalue()))
 
+        def ocr_section(section):
+            batch_start, batch_end, section_bytes = section
             for attempt in range(MAX_RETRIES):
                 try:
                     time.sleep(VISION_DELAY)
@@ -161,6 +292,7 @@ def extract_text_with_gemini(client, types, pdf_bytes, filename, page_count):
                         config={"http_options": {"timeout": GEMINI_TIMEOUT_MS}}
                     )
                     batch_text = (response.text or "").strip()
+                    section_texts = []
                     if batch_text:
                         # Distribute text evenly across the pages in this batch
                         n_pages = batch_end - batch_start
@@ -168,9 +300,9 @@ def extract_text_with_gemini(client, types, pdf_bytes, filename, page_count):
                         for p in range(n_pages):
                             p_start = p * chars_per_page
                             p_end = (p + 1) * chars_per_page if p < n_pages - 1 else len(batch_text)
-                            page_texts.append((batch_start + p + 1, batch_text[p_start:p_end]))
+                            section_texts.append((batch_start + p + 1, batch_text[p_start:p_end]))
                     print(f"    Pages {batch_start+1}-{batch_end}: {len(batch_text)} chars")
-                    break
+                    return section_texts
                 except Exception as e:
                     if attempt < MAX_RETRIES - 1:
                         wait = (attempt + 1) * 10
@@ -178,6 +310,14 @@ def extract_text_with_gemini(client, types, pdf_bytes, filename, page_count):
                         time.sleep(wait)
                     else:
                         print(f"    FAILED pages {batch_start+1}-{batch_end}: {e}")
+            return []
+
+        # Sections are independent network-bound calls: run a few at once,
+        # each worker still pacing its own calls by VISION_DELAY. map keeps page order.
+        page_texts = []
+        with ThreadPoolExecutor(max_workers=max(1, min(VISION_WORKERS, len(sections)))) as ex:
+            for section_texts in ex.map(ocr_section, sections):
+                page_texts.extend(section_texts)
 
         return page_texts
     else:
@@ -217,6 +357,8 @@ def extract_text_with_gemini(client, types, pdf_bytes, filename, page_count):
 
 
 UPSERT_BATCH_SIZE = 100  # vectors per Pinecone upsert call
+UPSERT_POOL_THREADS = 8  # Pinecone client threads for in-flight async upserts
+SUPABASE_BATCH_SIZE = 500  # document_chunks rows per Supabase upsert (as in backfill_chunks.py)
 
 
 def extract_metadata_heuristic(text, filename):
@@ -272,7 +414,8 @@ def extract_metadata_heuristic(text, filename):
 
 
 def _dual_write_chunks(supabase_client, batch):
-    """Write a Pinecone batch to Supabase document_chunks. Non-blocking on failure."""
+    """Write upserted vectors to Supabase document_chunks, SUPABASE_BATCH_SIZE rows
+    per request. Non-blocking on failure."""
     if not supabase_client:
         return
     try:
@@ -290,58 +433,107 @@ def _dual_write_chunks(supabase_client, batch):
                 "organizations": meta.get("organizations", []) or [],
                 "dates": meta.get("dates", []) or [],
             })
-        if rows:
-            supabase_client.table("document_chunks").upsert(rows).execute()
+        for start in range(0, len(rows), SUPABASE_BATCH_SIZE):
+            supabase_client.table("document_chunks").upsert(rows[start:start + SUPABASE_BATCH_SIZE]).execute()
     except Exception as e:
         print(f"    Supabase dual-write failed (non-fatal): {e}")
 
 
-def embed_and_upsert(client, index, chunks_with_pages, filename, gcs_path, supabase_client=None):
+def embed_and_upsert(client, index, files, supabase_client=None, cache=None):
     """Embed text chunks and batch-upsert into Pinecone with enriched metadata.
 
+    Chunks from all files are pooled, so a run of small files shares
+    embed_content calls (and EMBED_BATCH_DELAY waits) instead of paying one
+    each. Each group of UPSERT_BATCH_SIZE chunks is embedded with a single
+    embed_content call and written with a single upsert. Up to EMBED_WORKERS
+    embed calls are in flight at once, and upserts are sent with async_req so
+    they overlap the embedding too; all of them are confirmed before returning.
+
     Args:
-        chunks_with_pages: list of (chunk_text, page_number) tuples.
+        files: list of (filename, gcs_path, chunks_with_pages) tuples, where
+            chunks_with_pages is a list of (chunk_text, page_number) tuples.
         supabase_client: optional Supabase client for dual-write.
+        cache: optional open_cache() connection; cached chunk embeddings are reused.
+
+    Returns:
+        list of vectors upserted per file, in the order of files. A file with
+        chunks in a batch that still failed to embed after MAX_RETRIES gets None.
     """
-    upserted = 0
-    batch = []
-    for i, (chunk, page) in enumerate(chunks_with_pages):
+    # (chunk_text, page, position in files, chunk index within its file)
+    items = [
+        (chunk, page, f, i)
+        for f, (_, _, chunks_with_pages) in enumerate(files)
+        for i, (chunk, page) in enumerate(chunks_with_pages)
+    ]
+    upserted = [0] * len(files)
+    failed = set()  # positions in files with a batch that never embedded
+
+    def embed_batch(batch_start, batch_end, texts):
+        """Network-only part of a batch (runs on the embed pool); None on failure."""
         for attempt in range(MAX_RETRIES):
             try:
                 time.sleep(EMBED_BATCH_DELAY)
-                res = client.models.embed_content(
-                    model="gemini-embedding-001",
-                    contents=[chunk]
-                )
-                vec_id = f"{filename}-chunk-{i}"
-                meta = {
-                    "text": chunk,
-                    "filename": filename,
-                    "gcs_path": gcs_path,
-                    "chunk_index": i,
-                    "page": page,
-                }
-                meta.update(extract_metadata_heuristic(chunk, filename))
-                batch.append((vec_id, res.embeddings[0].values, meta))
-                upserted += 1
-                if len(batch) >= UPSERT_BATCH_SIZE:
-                    index.upsert(vectors=batch)
-                    _dual_write_chunks(supabase_client, batch)
-                    print(f"    Flushed batch of {len(batch)} vectors")
-                    batch = []
-                break
+                res = client.models.embed_content(model=EMBED_MODEL, contents=texts)
+                return [e.values for e in res.embeddings]
             except Exception as e:
                 if attempt < MAX_RETRIES - 1:
                     wait = (attempt + 1) * 5
-                    print(f"    Embed retry {attempt+1} chunk {i} (waiting {wait}s): {e}")
+                    print(f"    Embed retry {attempt+1} chunks {batch_start}-{batch_end} (waiting {wait}s): {e}")
                     time.sleep(wait)
                 else:
-                    print(f"    FAILED to embed chunk {i}: {e}")
-    if batch:
-        index.upsert(vectors=batch)
-        _dual_write_chunks(supabase_client, batch)
-        print(f"    Flushed final batch of {len(batch)} vectors")
-    return upserted
+                    print(f"    FAILED to embed chunks {batch_start}-{batch_end}: {e}")
+        return None
+
+    # Cache lookups stay on this thread (the sqlite connection isn't shared);
+    # only the uncached texts of each batch go out to the pool
+    prepared = []  # (group, texts, cached, missing, future or None)
+    embed_pool = ThreadPoolExecutor(max_workers=EMBED_WORKERS)
+    for batch_start in range(0, len(items), UPSERT_BATCH_SIZE):
+        group = items[batch_start:batch_start + UPSERT_BATCH_SIZE]
+        batch_end = batch_start + len(group) - 1
+        texts = [chunk for chunk, _, _, _ in group]
+        cached = cached_embeddings(cache, texts)
+        missing = [i for i in range(len(texts)) if i not in cached]
+        future = embed_pool.submit(embed_batch, batch_start, batch_end, [texts[i] for i in missing]) if missing else None
+        prepared.append((group, texts, cached, missing, future))
+    embed_pool.shutdown(wait=False)
+
+    pending = []  # (async upsert result, file position of each vector)
+    written = []  # (vec_id, None, meta) for the Supabase dual-write after the upserts land
+    for group, texts, cached, missing, future in prepared:
+        fresh = future.result() if future else []
+        if fresh is None:
+            failed.update(f for _, _, f, _ in group)
+            continue
+        if fresh:
+            store_embeddings(cache, [texts[i] for i in missing], fresh)
+        embeddings = [cached.get(i) for i in range(len(texts))]
+        for i, values in zip(missing, fresh):
+            embeddings[i] = values
+
+        batch = []
+        for (chunk, page, f, i), values in zip(group, embeddings):
+            filename, gcs_path, _ = files[f]
+            meta = {
+                "text": chunk,
+                "filename": filename,
+                "gcs_path": gcs_path,
+                "chunk_index": i,
+                "page": page,
+            }
+            meta.update(extract_metadata_heuristic(chunk, filename))
+            batch.append((f"{filename}-chunk-{i}", values, meta))
+        pending.append((index.upsert(vectors=batch, async_req=True), [f for _, _, f, _ in group]))
+        written.extend((vec_id, None, meta) for vec_id, _, meta in batch)
+
+    # Block until Pinecone has acknowledged every batch; .get() re-raises failures
+    for result, owners in pending:
+        result.get()
+        for f in owners:
+            upserted[f] += 1
+        print(f"    Flushed batch of {len(owners)} vectors")
+    _dual_write_chunks(supabase_client, written)
+    return [None if f in failed else n for f, n in enumerate(upserted)]
 
 
 def classify_dataset(filename):
@@ -438,14 +630,13 @@ def main():
     from google.genai import types
     from google.cloud import storage
     from pinecone import Pinecone
-    from pypdf import PdfReader
-    import io
 
     genai_client = genai.Client(api_key=env["GOOGLE_API_KEY"])
     pc = Pinecone(api_key=env["PINECONE_API_KEY"])
-    pinecone_index = pc.Index("localwebb")
+    pinecone_index = pc.Index("localwebb", pool_threads=UPSERT_POOL_THREADS)
     storage_client = storage.Client()
     bucket = storage_client.bucket(env["GCS_BUCKET_NAME"])
+    cache = open_cache()
 
     # Initialize Supabase for dual-write
     supabase_client = None
@@ -461,23 +652,26 @@ def main():
     except Exception as e:
         print(f"Supabase init failed (dual-write disabled): {e}")
 
-    # List all PDFs
-    blobs = [b for b in bucket.list_blobs() if b.name.lower().endswith(".pdf")]
-    print(f"\nFound {len(blobs)} PDFs in GCS bucket '{env['GCS_BUCKET_NAME']}'")
-
-    # Filter by dataset if specified
-    if dataset_filter:
-        filtered = []
-        for b in blobs:
-            ds = classify_dataset(b.name)
-            if ds in dataset_filter:
-                filtered.append(b)
-        print(f"Filtered to {len(filtered)} PDFs from data set(s): {', '.join(sorted(dataset_filter))}")
-        blobs = filtered
+    # List PDFs, applying the data set filter in the same pass. In test mode,
+    # stop paging through the bucket listing at the first match.
+    blobs = []
+    found = 0
+    for b in bucket.list_blobs():
+        if not b.name.lower().endswith(".pdf"):
+            continue
+        found += 1
+        if dataset_filter and classify_dataset(b.name) not in dataset_filter:
+            continue
+        blobs.append(b)
+        if args.test:
+            break
 
     if args.test:
-        blobs = blobs[:1]
-        print("TEST MODE: processing 1 file only\n")
+        print("\nTEST MODE: processing 1 file only\n")
+    else:
+        print(f"\nFound {found} PDFs in GCS bucket '{env['GCS_BUCKET_NAME']}'")
+        if dataset_filter:
+            print(f"Filtered to {len(blobs)} PDFs from data set(s): {', '.join(sorted(dataset_filter))}")
 
     # Load or reset progress
     if args.resume:
@@ -514,40 +708,152 @@ def main():
     files_processed_this_run = 0
     per_dataset_stats = {}  # dataset -> {"completed": 0, "failed": 0, "vectors": 0}
 
+    # Download the next few PDFs in the background while the current one is
+    # OCR'd/embedded, so GCS transfer time overlaps with the API-bound work
+    download_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_PREFETCH)
+    # pypdf parsing is CPU-bound pure Python, so it runs in worker processes,
+    # several files at once, instead of on this thread between API calls.
+    # Workers are spawned, not forked: by now this process has live client
+    # threads, and a forked child can deadlock on a lock one of them held.
+    def new_extract_pool(workers=EXTRACT_WORKERS):
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    extract_pool = new_extract_pool()
+    extract_pool_lock = threading.Lock()
+
+    def run_extract(pdf_bytes, known_scanned):
+        """extract_standard_text on the worker pool, replacing the pool if a worker dies.
+
+        A dead worker breaks the pool for every file queued on it. Each of those
+        files is retried in its own single-worker process, so only the PDF that
+        actually kills a worker is reported as an error.
+        """
+        nonlocal extract_pool
+        pool = extract_pool
+        try:
+            return pool.submit(extract_standard_text, pdf_bytes, known_scanned).result()
+        except BrokenProcessPool:
+            with extract_pool_lock:
+                if extract_pool is pool:
+                    print("  WARNING: extraction worker died, restarting the extraction pool")
+                    pool.shutdown(wait=False)
+                    extract_pool = new_extract_pool()
+        isolated = new_extract_pool(workers=1)
+        try:
+            return isolated.submit(extract_standard_text, pdf_bytes, known_scanned).result()
+        finally:
+            isolated.shutdown(wait=False)
+
+    def fetch_and_extract(blob):
+        pdf_bytes = blob.download_as_bytes()
+        # Verify against the digest scrape_doj.py recorded while downloading,
+        # before spending a parse on corrupt bytes. One OpenSSL call over the
+        # whole buffer (GIL released), on the prefetch thread, not the main loop.
+        pdf_sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+        expected_sha256 = (blob.metadata or {}).get("sha256")
+        if expected_sha256 and expected_sha256 != pdf_sha256:
+            raise ValueError(f"SHA-256 mismatch (expected {expected_sha256[:12]}, got {pdf_sha256[:12]})")
+        known_scanned = has_cached_ocr(pdf_sha256)
+        return pdf_bytes, pdf_sha256, run_extract(pdf_bytes, known_scanned)
+
+    downloads = {}  # position in to_process -> future of PDF bytes
+
+    def record_completed(blob, filename, upserted):
+        nonlocal files_processed_this_run
+        progress["completed"].append(filename)
+        progress["vectors_upserted"] += upserted
+        # Remove from failed list if previously failed
+        if filename in progress["failed"]:
+            progress["failed"].remove(filename)
+        save_progress(progress)
+        files_processed_this_run += 1
+        pbar.set_postfix_str(f"{filename[:30]} OK", refresh=False)
+
+        # Track per-dataset stats (use full blob path for classification)
+        ds = classify_dataset(blob.name)
+        if ds not in per_dataset_stats:
+            per_dataset_stats[ds] = {"completed": 0, "failed": 0, "vectors": 0}
+        per_dataset_stats[ds]["completed"] += 1
+        per_dataset_stats[ds]["vectors"] += upserted
+
+    def record_error(blob, filename):
+        nonlocal files_processed_this_run
+        if filename not in progress["failed"]:
+            progress["failed"].append(filename)
+        save_progress(progress)
+        files_processed_this_run += 1
+        pbar.set_postfix_str(f"{filename[:30]} ERR", refresh=False)
+
+        ds = classify_dataset(blob.name)
+        if ds not in per_dataset_stats:
+            per_dataset_stats[ds] = {"completed": 0, "failed": 0, "vectors": 0}
+        per_dataset_stats[ds]["failed"] += 1
+
+    # Chunked files wait here until they add up to a full embed batch, so runs of
+    # small PDFs share embed_content calls. A file is only recorded as completed
+    # once its vectors are upserted; an interrupted run just redoes the pending ones.
+    pending_files = []  # (blob, filename, gcs_path, chunks_with_pages)
+    pending_chunks = 0
+
+    def flush_pending():
+        nonlocal pending_chunks
+        group = pending_files[:]
+        pending_files.clear()
+        pending_chunks = 0
+        n_chunks = sum(len(chunks) for _, _, _, chunks in group)
+        print(f"  Embedding and upserting {n_chunks} chunks from {len(group)} file(s)...")
+        try:
+            counts = embed_and_upsert(
+                genai_client, pinecone_index,
+                [(filename, gcs_path, chunks) for _, filename, gcs_path, chunks in group],
+                supabase_client=supabase_client, cache=cache,
+            )
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            for blob, filename, _, _ in group:
+                record_error(blob, filename)
+            # Wait a bit after errors (might be rate limiting)
+            time.sleep(10)
+            return
+        for (blob, filename, _, _), upserted in zip(group, counts):
+            if upserted is None:
+                print(f"  ERROR: {filename}: some chunks failed to embed")
+                record_error(blob, filename)
+                continue
+            print(f"  {filename}: upserted {upserted} vectors")
+            record_completed(blob, filename, upserted)
+
     # Process each PDF with tqdm progress bar
-    pbar = tqdm(to_process, desc="Vectorizing", unit="file", dynamic_ncols=True)
-    for blob in pbar:
+    # Postfix updates only mark the bar dirty; tqdm redraws at most every
+    # mininterval instead of once per call (several calls per file)
+    pbar = tqdm(to_process, desc="Vectorizing", unit="file", dynamic_ncols=True, mininterval=0.5)
+    for pos, blob in enumerate(pbar):
         filename = blob.name.split("/")[-1]
-        pbar.set_postfix_str(filename[:40], refresh=True)
+        pbar.set_postfix_str(filename[:40], refresh=False)
+        for ahead in range(pos, min(pos + DOWNLOAD_PREFETCH + 1, len(to_process))):
+            if ahead not in downloads:
+                downloads[ahead] = download_pool.submit(fetch_and_extract, to_process[ahead])
 
         print(f"\n{'='*60}")
         print(f"Processing: {filename} ({blob.size/(1024*1024):.1f} MB)")
         print(f"{'='*60}")
 
         try:
-            # Download PDF
-            print("  Downloading from GCS...")
-            pdf_bytes = blob.download_as_bytes()
-
-            # Get page count
-            reader = PdfReader(io.BytesIO(pdf_bytes))
-            page_count = len(reader.pages)
+            # Download PDF and run standard text extraction (usually already prefetched)
+            print("  Downloading from GCS and extracting text...")
+            pdf_bytes, pdf_sha256, (page_count, page_texts, good_pages) = downloads.pop(pos).result()
             print(f"  Pages: {page_count}")
 
-            # First try standard text extraction (with page tracking)
-            print("  Trying standard text extraction...")
-            page_texts = []  # list of (page_number, text)
-            good_pages = 0
-            for page_idx, page in enumerate(reader.pages):
-                page_text = (page.extract_text() or "").strip()
-                clean_words = [w for w in page_text.split() if len(w) > 2 and w.isalpha()]
-                if len(clean_words) >= 10:
-                    good_pages += 1
-                page_texts.append((page_idx + 1, page_text))
-
             quality_ratio = good_pages / max(page_count, 1)
+            if page_texts is None:
+                # Seen these bytes before as a scanned PDF; don't re-probe them
+                print("  Standard OCR: skipped, these bytes already needed vision OCR")
+                page_texts = []
+            elif len(page_texts) < page_count:
+                print(f"  Standard OCR: stopped after {len(page_texts)}/{page_count} pages, too few readable")
+            else:
+                print(f"  Standard OCR: {good_pages}/{page_count} pages readable ({quality_ratio:.0%})")
             total_standard_chars = sum(len(t) for _, t in page_texts)
-            print(f"  Standard OCR: {good_pages}/{page_count} pages readable ({quality_ratio:.0%})")
 
             # Use standard text if quality is good enough, otherwise use Gemini vision
             if quality_ratio >= 0.5 and total_standard_chars > 200:
@@ -557,11 +863,16 @@ def main():
                 if filename not in progress["failed"]:
                     progress["failed"].append(filename)
                 save_progress(progress)
-                pbar.set_postfix_str(f"{filename[:30]} SKIP", refresh=True)
+                pbar.set_postfix_str(f"{filename[:30]} SKIP", refresh=False)
                 continue
             else:
                 print(f"  Using Gemini vision OCR...")
-                page_texts = extract_text_with_gemini(genai_client, types, pdf_bytes, filename, page_count)
+                page_texts = cached_ocr(cache, pdf_sha256)
+                if page_texts is not None:
+                    print(f"  Using cached OCR for identical PDF bytes")
+                else:
+                    page_texts = extract_text_with_gemini(genai_client, types, pdf_bytes, filename, page_count)
+                    store_ocr(cache, pdf_sha256, page_texts)
                 total_chars = sum(len(t) for _, t in page_texts)
                 print(f"  Gemini extracted {total_chars} chars across {len(page_texts)} page segments")
 
@@ -571,52 +882,32 @@ def main():
                 if filename not in progress["failed"]:
                     progress["failed"].append(filename)
                 save_progress(progress)
-                pbar.set_postfix_str(f"{filename[:30]} FAIL", refresh=True)
+                pbar.set_postfix_str(f"{filename[:30]} FAIL", refresh=False)
                 continue
 
             # Chunk the text with page tracking
             chunks_with_pages = chunk_text_with_pages(page_texts)
             print(f"  Split into {len(chunks_with_pages)} chunks (with page numbers)")
 
-            # Embed and upsert
+            # Queue for embedding; flush once a full batch of chunks is pending
             gcs_path = f"gs://{env['GCS_BUCKET_NAME']}/{blob.name}"
-            print(f"  Embedding and upserting...")
-            upserted = embed_and_upsert(genai_client, pinecone_index, chunks_with_pages, filename, gcs_path, supabase_client=supabase_client)
-            print(f"  Upserted {upserted} vectors")
-
-            progress["completed"].append(filename)
-            progress["vectors_upserted"] += upserted
-            # Remove from failed list if previously failed
-            if filename in progress["failed"]:
-                progress["failed"].remove(filename)
-            save_progress(progress)
-            files_processed_this_run += 1
-            pbar.set_postfix_str(f"{filename[:30]} OK", refresh=True)
-
-            # Track per-dataset stats (use full blob path for classification)
-            ds = classify_dataset(blob.name)
-            if ds not in per_dataset_stats:
-                per_dataset_stats[ds] = {"completed": 0, "failed": 0, "vectors": 0}
-            per_dataset_stats[ds]["completed"] += 1
-            per_dataset_stats[ds]["vectors"] += upserted
+            pending_files.append((blob, filename, gcs_path, chunks_with_pages))
+            pending_chunks += len(chunks_with_pages)
+            if pending_chunks >= UPSERT_BATCH_SIZE:
+                flush_pending()
 
         except Exception as e:
             print(f"  ERROR: {e}")
-            if filename not in progress["failed"]:
-                progress["failed"].append(filename)
-            save_progress(progress)
-            files_processed_this_run += 1
-            pbar.set_postfix_str(f"{filename[:30]} ERR", refresh=True)
-
-            ds = classify_dataset(blob.name)
-            if ds not in per_dataset_stats:
-                per_dataset_stats[ds] = {"completed": 0, "failed": 0, "vectors": 0}
-            per_dataset_stats[ds]["failed"] += 1
+            record_error(blob, filename)
 
             # Wait a bit after errors (might be rate limiting)
             time.sleep(10)
 
+    if pending_files:
+        flush_pending()
     pbar.close()
+    download_pool.shutdown()
+    extract_pool.shutdown()
 
     # Summary
     total_elapsed = time.time() - processing_start
@@ -649,7 +940,8 @@ def main():
         from generate_pipeline_status import generate_status, upload_to_gcs
         print("\nUpdating pipeline status in GCS...")
         status = generate_status(bucket=bucket)
-        upload_to_gcs(status)
+        # Reuse this run's bucket (and its storage client's connection pool)
+        upload_to_gcs(status, bucket=bucket, bucket_name=bucket.name)
     except Exception as e:
         print(f"Warning: Could not update pipeline status: {e}")
 
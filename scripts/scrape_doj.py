@@ -25,8 +25,12 @@ import os
 import sys
 import json
 import time
+import hashlib
 import argparse
 import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urljoin, unquote
 from datetime import datetime, timezone
@@ -56,9 +60,11 @@ PRIORITY_ORDER = [11, 12, 1, 8, 2, 4, 5, 6, 7, 3]
 
 # Rate limiting
 REQUEST_DELAY = 1.5  # seconds between DOJ page requests
-DOWNLOAD_DELAY = 0.5  # seconds between PDF downloads
+DOWNLOAD_DELAY = 0.5  # seconds between PDF downloads (per worker)
+DOWNLOAD_WORKERS = 4  # concurrent PDF downloads
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 30
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # bytes per streamed read of a PDF body
 
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -116,7 +122,10 @@ def get_session():
         "justiceGovAgeVerified", "true",
         domain="www.justice.gov", path="/",
     )
+    # One keep-alive pool per host, shared by every page fetch and PDF download
     adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
         max_retries=requests.adapters.Retry(
             total=MAX_RETRIES,
             backoff_factor=1,
@@ -128,6 +137,28 @@ def get_session():
     return session
 
 
+_thread_state = threading.local()
+
+
+def get_worker_session(session):
+    """
+    This download thread's own copy of `session`. requests.Session (and its
+    cookie jar) isn't thread-safe, so workers don't share one. Each copy has the
+    same headers and cookies and mounts the same HTTPAdapter, so they all
+    still draw from one keep-alive pool.
+    """
+    worker_session = getattr(_thread_state, "session", None)
+    if worker_session is None:
+        worker_session = requests.Session()
+        worker_session.headers.clear()
+        worker_session.headers.update(session.headers)
+        worker_session.cookies.update(session.cookies)
+        for prefix, adapter in session.adapters.items():
+            worker_session.mount(prefix, adapter)
+        _thread_state.session = worker_session
+    return worker_session
+
+
 def discover_dataset_urls(session, dataset_num, bucket=None):
     """Crawl a DOJ data set page and all its pagination to find PDF links.
 
@@ -224,6 +255,9 @@ def discover_dataset_urls(session, dataset_num, bucket=None):
 
 def download_and_upload(session, pdf_url, bucket, progress, dataset_num):
     """Download a PDF from DOJ and upload to GCS."""
+    # Runs on a download worker thread; never touch the shared session from here
+    session = get_worker_session(session)
+
     # Extract filename from URL
     filename = unquote(pdf_url.split("/")[-1])
     gcs_path = f"uploads/dataset-{dataset_num}/{filename}"
@@ -232,35 +266,51 @@ def download_and_upload(session, pdf_url, bucket, progress, dataset_num):
     if filename in progress["files_downloaded"]:
         return "skip"
 
-    # Download from DOJ
+    # Download from DOJ, streaming the body through SHA-256 as it arrives. If a
+    # transfer drops mid-body, the retry asks for just the missing bytes.
+    content = bytearray()
+    digest = hashlib.sha256()
+    complete = False  # body fully received and verified; a retry only re-uploads
     for attempt in range(MAX_RETRIES):
         try:
-            time.sleep(DOWNLOAD_DELAY)
-            resp = session.get(pdf_url, timeout=60)
-            resp.raise_for_status()
+            if not complete:
+                time.sleep(DOWNLOAD_DELAY)
+                headers = {"Range": f"bytes={len(content)}-"} if content else None
+                with session.get(pdf_url, timeout=60, stream=True, headers=headers) as resp:
+                    resp.raise_for_status()
+                    if content and (resp.status_code != 206 or resp.headers.get("Content-Encoding")):
+                        # Server ignored the range (or re-encoded the body) — start over
+                        content = bytearray()
+                        digest = hashlib.sha256()
+                    content_type = resp.headers.get("Content-Type", "")
+                    for chunk in resp.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        content += chunk
+                        digest.update(chunk)
+
+                # Verify we got a PDF, not an HTML age-gate page
+                if "text/html" in content_type or content[:5] != b"%PDF-":
+                    content = bytearray()
+                    digest = hashlib.sha256()
+                    if attempt < MAX_RETRIES - 1:
+                        print(f"    Got HTML instead of PDF (age gate?), retrying...")
+                        # Re-set the age verification cookie
+                        session.cookies.set(
+                            "justiceGovAgeVerified", "true",
+                            domain="www.justice.gov", path="/",
+                        )
+                        time.sleep(3)
+                        continue
+                    else:
+                        print(f"    FAILED: {filename}: received HTML instead of PDF")
+                        return "fail"
+                complete = True
 
-            # Verify we got a PDF, not an HTML age-gate page
-            content_type = resp.headers.get("Content-Type", "")
-            if "text/html" in content_type or resp.content[:5] != b"%PDF-":
-                if attempt < MAX_RETRIES - 1:
-                    print(f"    Got HTML instead of PDF (age gate?), retrying...")
-                    # Re-set the age verification cookie
-                    session.cookies.set(
-                        "justiceGovAgeVerified", "true",
-                        domain="www.justice.gov", path="/",
-                    )
-                    time.sleep(3)
-                    continue
-                else:
-                    print(f"    FAILED: {filename}: received HTML instead of PDF")
-                    return "fail"
-
-            content = resp.content
             size_mb = len(content) / (1024 * 1024)
 
-            # Upload to GCS
+            # Upload to GCS, tagging the blob with the digest computed during download
             blob = bucket.blob(gcs_path)
-            blob.upload_from_string(content, content_type="application/pdf")
+            blob.metadata = {"sha256": digest.hexdigest()}
+            blob.upload_from_string(bytes(content), content_type="application/pdf")
 
             print(f"    Uploaded: {filename} ({size_mb:.1f} MB)")
             return "ok"
@@ -268,7 +318,8 @@ def download_and_upload(session, pdf_url, bucket, progress, dataset_num):
         except Exception as e:
             if attempt < MAX_RETRIES - 1:
                 wait = (attempt + 1) * 5
-                print(f"    Retry {attempt + 1} for {filename} (waiting {wait}s): {e}")
+                resume = f", resuming at {len(content):,} bytes" if content and not complete else ""
+                print(f"    Retry {attempt + 1} for {filename} (waiting {wait}s{resume}): {e}")
                 time.sleep(wait)
             else:
                 print(f"    FAILED: {filename}: {e}")
@@ -319,6 +370,7 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="List URLs only, don't download")
     parser.add_argument("--test", action="store_true", help="Download only 1 file for testing")
     parser.add_argument("--max-files", type=int, default=0, help="Max files to download per dataset (0 = unlimited)")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help=f"Concurrent PDF downloads (default: {DOWNLOAD_WORKERS})")
     args = parser.parse_args()
 
     # Determine which datasets to process
@@ -417,21 +469,40 @@ def main():
         ds_start_time = datetime.now(timezone.utc).isoformat()
         files_since_progress = 0
 
+        # Files still to fetch, in listing order. Ones already in GCS, already
+        # downloaded in this session, or listed twice count as skipped up front.
+        todo = []
+        queued = set()
         for i, url in enumerate(pdf_urls):
             filename = unquote(url.split("/")[-1])
-
-            # Skip if already in GCS
-            if filename in existing_files:
-                ds_skipped += 1
-                continue
-
-            # Skip if already downloaded in this session
-            if filename in progress["files_downloaded"]:
+            if filename in existing_files or filename in progress["files_downloaded"] or filename in queued:
                 ds_skipped += 1
                 continue
+            queued.add(filename)
+            todo.append((i, url, filename))
+
+        # Download several PDFs at once (each worker keeps its own DOWNLOAD_DELAY
+        # pacing); results are recorded in listing order. In-flight downloads
+        # never exceed what --test/--max-files still allow.
+        workers = 1 if args.test else max(1, args.workers)
+        limit = 1 if args.test else args.max_files
+        pool = ThreadPoolExecutor(max_workers=workers)
+        in_flight = deque()
+        todo_iter = iter(todo)
+        stop = False
+        while True:
+            while not stop and len(in_flight) < workers and (not limit or ds_downloaded + len(in_flight) < limit):
+                nxt = next(todo_iter, None)
+                if nxt is None:
+                    break
+                i, url, filename = nxt
+                print(f"  [{i+1}/{len(pdf_urls)}] {filename}")
+                in_flight.append((i, filename, pool.submit(download_and_upload, session, url, bucket, progress, ds_num)))
+            if not in_flight:
+                break
 
-            print(f"  [{i+1}/{len(pdf_urls)}] {filename}")
-            result = download_and_upload(session, url, bucket, progress, ds_num)
+            i, filename, future = in_flight.popleft()
+            result = future.result()
 
             if result == "ok":
                 progress["files_downloaded"].append(filename)
@@ -454,13 +525,14 @@ def main():
                     ds_downloaded, ds_skipped, ds_failed, ds_start_time,
                 )
 
-            if args.test and ds_downloaded >= 1:
+            if not stop and args.test and ds_downloaded >= 1:
                 print("\n  TEST MODE: stopping after 1 download")
-                break
+                stop = True
 
-            if args.max_files and ds_downloaded >= args.max_files:
+            if not stop and args.max_files and ds_downloaded >= args.max_files:
                 print(f"\n  Reached --max-files limit ({args.max_files}), stopping")
-                break
+                stop = True
+        pool.shutdown()
 
         total_downloaded += ds_downloaded
         total_skipped += ds_skipped
@@ -506,7 +578,8 @@ def main():
             from generate_pipeline_status import generate_status, upload_to_gcs
             print("\nUpdating pipeline status in GCS...")
             status = generate_status(bucket=bucket)
-            upload_to_gcs(status)
+            # Reuse this run's bucket (and its storage client's connection pool)
+            upload_to_gcs(status, bucket=bucket, bucket_name=bucket.name)
         except Exception as e:
             print(f"Warning: Could not update pipeline status: {e}")
 
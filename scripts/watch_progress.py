@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 """Real-time terminal progress display for the reindex pipeline.
 
-Polls reindex_progress.json every 2 seconds and displays a live progress bar
-with stats. Uses ANSI escape codes to overwrite lines in-place.
+Watches reindex_progress.json and displays a live progress bar with stats.
+The file is stat'ed every quarter second and only re-parsed when it changes;
+the display is also refreshed every 2 seconds to keep rate/ETA current.
+Uses ANSI escape codes to overwrite lines in-place.
 
 Usage:
     python3 scripts/watch_progress.py
@@ -22,6 +24,7 @@ REINDEX_PATH = os.path.join(SCRIPT_DIR, "reindex_progress.json")
 SCRAPE_PATH = os.path.join(SCRIPT_DIR, "scrape_progress.json")
 
 POLL_INTERVAL = 2
+STAT_INTERVAL = 0.25  # seconds between cheap mtime checks on the progress file
 BAR_WIDTH = 40
 
 
@@ -33,6 +36,15 @@ def load_json(path):
         return None
 
 
+def file_signature(path):
+    """Return (mtime_ns, size) for path, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 def build_dataset_file_map(scrape_data):
     """Build a mapping of filename -> dataset number from urls_discovered."""
     file_to_ds = {}
@@ -163,7 +175,7 @@ def main():
     parser = argparse.ArgumentParser(description="Watch reindex pipeline progress in real-time")
     parser.add_argument("--total", type=int, default=None, help="Override total file count")
     parser.add_argument("--dataset", type=str, default=None, help="Filter to specific datasets, comma-separated (e.g., 1,2,4,7,6)")
-    parser.add_argument("--interval", type=int, default=POLL_INTERVAL, help="Poll interval in seconds (default: 2)")
+    parser.add_argument("--interval", type=int, default=POLL_INTERVAL, help="Display refresh interval in seconds (default: 2)")
     args = parser.parse_args()
 
     dataset_filter = None
@@ -204,16 +216,32 @@ def main():
         sys.exit(0)
     signal.signal(signal.SIGINT, handle_sigint)
 
+    # The progress file holds every completed filename, so only re-parse it when
+    # its mtime/size changes; in between, re-render the cached data for rate/ETA.
+    last_sig = False  # sentinel: never equal to a real signature or None
+    last_render = 0.0
+    reindex_data = None
     while True:
-        reindex_data = load_json(REINDEX_PATH)
-        if reindex_data is None:
-            sys.stdout.write("\033[6A\033[J")
-            sys.stdout.write(f" Waiting for {REINDEX_PATH}...\n\n\n\n\n\n")
-            sys.stdout.flush()
-        else:
-            render(reindex_data, total, dataset_filter, file_to_ds, start_time, prev_completed)
-
-        time.sleep(args.interval)
+        sig = file_signature(REINDEX_PATH)
+        changed = sig != last_sig
+        if changed:
+            data = load_json(REINDEX_PATH) if sig is not None else None
+            if data is not None or sig is None:
+                last_sig = sig
+                reindex_data = data
+            # else: caught mid-write; keep the last good data and retry next tick
+
+        now = time.time()
+        if changed or now - last_render >= args.interval:
+            last_render = now
+            if reindex_data is None:
+                sys.stdout.write("\033[6A\033[J")
+                sys.stdout.write(f" Waiting for {REINDEX_PATH}...\n\n\n\n\n\n")
+                sys.stdout.flush()
+            else:
+                render(reindex_data, total, dataset_filter, file_to_ds, start_time, prev_completed)
+
+        time.sleep(STAT_INTERVAL)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,14 @@
+from api.investigator import _string_list
+
+
+def test_string_list_null_is_empty():
+    assert _string_list(None) == []
+
+
+def test_string_list_bare_string_is_empty():
+    # A string must not be iterated into single-character entries
+    assert _string_list("Who funded the flights?") == []
+
+
+def test_string_list_keeps_only_non_empty_strings():
+    assert _string_list(["  Who else flew?  ", "", "   ", None, 3, ["nested"]]) == ["Who else flew?"]